@@ -0,0 +1,25 @@
+"""Compiled numeric kernels used by the spectrum analyzer."""
+
+import math
+
+from numba import njit, prange
+
+
+# No cache=True: numba can only locate a disk cache next to the .py source, which the
+# frozen app does not ship; the kernel compiles on first use in the FFT worker thread
+@njit(parallel=True, fastmath=True, nogil=True)
+def power_to_db(spectrum, scale, floor, out):
+    """
+    Convert complex FFT rows into dB power in a single pass.
+
+    Args:
+        spectrum: Complex spectrum, one row per frame
+        scale: Factor applied to |X|^2 before the floor
+        floor: Smallest power, keeping log10 finite for silent bins
+        out: Float array of the same shape receiving 10*log10(power)
+    """
+    for i in prange(spectrum.shape[0]):
+        for k in range(spectrum.shape[1]):
+            re = spectrum[i, k].real
+            im = spectrum[i, k].imag
+            out[i, k] = 10.0 * math.log10(max((re * re + im * im) * scale, floor))
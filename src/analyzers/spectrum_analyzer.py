@@ -1,20 +1,73 @@
 """A module containing the SpectrumAnalyzer class for real-time audio spectrum analysis."""
 
+import functools
+import logging
+import os
 import queue
 import threading
+from pathlib import Path
 from typing import Optional, Callable, Dict, Any
 
 import librosa
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from scipy import signal
+from scipy.fft import next_fast_len, rfft
 from PySide6.QtWidgets import QMessageBox
 
+from analyzers._kernels import power_to_db
+
+try:
+    import pyfftw
+except ImportError:  # optional; scipy.fft is used when it is not installed
+    pyfftw = None
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=16)
+def _hann(fft_size: int) -> np.ndarray:
+    """Return a cached, read-only float32 periodic Hann window of the given size."""
+    window = signal.windows.hann(fft_size, sym=False).astype(np.float32)
+    window.setflags(write=False)
+    return window
+
+
+@functools.lru_cache(maxsize=16)
+def _rfftfreq(fft_size: int, sample_rate: int) -> np.ndarray:
+    """Return cached, read-only frequency bins of a real FFT."""
+    freqs = np.fft.rfftfreq(fft_size, 1 / sample_rate)
+    freqs.setflags(write=False)
+    return freqs
+
+
+def load_fftw_wisdom(path: Path) -> None:
+    """Import FFTW plans saved by a previous run, so planning is skipped for known sizes."""
+    if pyfftw is None or not path.is_file():
+        return
+    try:
+        # One wisdom string per precision (double, single, long double)
+        pyfftw.import_wisdom(tuple(path.read_bytes().split(b"\0")))
+    except (OSError, ValueError, TypeError) as e:
+        logger.warning("Could not import FFTW wisdom from %s: %s", path, e)
+
+
+def save_fftw_wisdom(path: Path) -> None:
+    """Save the FFTW plans gathered in this run for the next one."""
+    if pyfftw is None:
+        return
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"\0".join(pyfftw.export_wisdom()))
+    except OSError as e:
+        logger.warning("Could not save FFTW wisdom to %s: %s", path, e)
+
 
 class SpectrumAnalyzer:
     """
     A streaming spectrum analyzer that processes audio in chunks and computes FFT in real-time.
     This class uses threading to read audio data and perform FFT calculations concurrently.
-    It supports a callback mechanism to return FFT results for each frame, allowing for real-time visualization.
+    It supports a callback mechanism to return FFT results for each batch of frames, allowing for real-time visualization.
     The analyzer can handle large audio files without loading them entirely into memory, making it suitable for long recordings.
     It uses a Hann window function by default for spectral analysis, which is common in audio processing.
     """
@@ -25,15 +78,18 @@ class SpectrumAnalyzer:
 
         Args:
             path: Path to audio file
-            callback: Function to call with (sample_index, fft_magnitudes) for each FFT result
-            fft_size: Size of FFT window (power of 2)
+            callback: Function to call with (first_frame_index, fft_magnitudes) for each batch,
+                where fft_magnitudes holds one row of dB values per consecutive frame
+            fft_size: Size of FFT window, rounded up to the next fast FFT length
             hop_length: Number of samples between successive frames
             batch_size: Number of frames to process in each batch (affects memory usage and performance)
         """
         self.path = path
         self.callback = callback
-        self.fft_size = fft_size
-        self.hop_length = hop_length or fft_size // 4
+        self.fft_size = next_fast_len(fft_size, real=True)
+        if self.fft_size != fft_size:
+            logger.warning("FFT size %d rounded up to %d for faster transforms", fft_size, self.fft_size)
+        self.hop_length = hop_length or self.fft_size // 4
         self.batch_size = batch_size
 
         # Audio properties
@@ -50,13 +106,57 @@ class SpectrumAnalyzer:
         self._reader_thread: Optional[threading.Thread] = None
         self._worker_thread: Optional[threading.Thread] = None
 
-        # Thread communication
-        self._audio_queue = queue.Queue(maxsize=10)
+        # Thread communication; None is the end-of-stream sentinel. The bound makes the
+        # reader wait for the FFT worker, so only a few decoded chunks are alive at once
+        self._audio_queue: queue.Queue = queue.Queue(maxsize=10)
 
-        # Pre-compute Hann window function and frequency bins
-        self._window_func = signal.windows.hann(self.fft_size)
+        # Shared periodic Hann window; frequency bins are resolved in load_metadata()
+        self._window_func = _hann(self.fft_size)
         self._freq_bins: Optional[np.ndarray] = None
 
+        # Scratch buffers for windowed frames and dB rows, reused for every batch
+        num_bins = self.fft_size // 2 + 1
+        if pyfftw is not None:
+            # SIMD-aligned so the FFTW plan built in the FFT worker can use them directly
+            self._windowed_buf = pyfftw.empty_aligned((self.batch_size, self.fft_size), dtype=np.float32)
+            self._spectrum_buf = pyfftw.empty_aligned((self.batch_size, num_bins), dtype=np.complex64)
+        else:
+            self._windowed_buf = np.empty((self.batch_size, self.fft_size), dtype=np.float32)
+            self._spectrum_buf = None
+        self._db_buf = np.empty((self.batch_size, num_bins), dtype=np.float32)
+        self._fft_plan = None
+
+    def load_metadata(self) -> Dict[str, Any]:
+        """
+        Read the audio metadata without starting the analysis.
+        The file header is only probed on the first call.
+
+        Returns:
+            Dict containing audio metadata
+        """
+        if self._freq_bins is None:
+            try:
+                # Get duration and sample rate from the file header, without decoding audio
+                self.duration = librosa.get_duration(path=self.path)
+                self.sample_rate = librosa.get_samplerate(self.path)
+                self.total_samples = int(self.duration * self.sample_rate)
+
+                # Use Nyquist frequency
+                self._freq_bins = _rfftfreq(self.fft_size, self.sample_rate)
+
+            except Exception as e:
+                raise RuntimeError(f"Failed to load audio metadata: {e}")
+
+        return {
+            'sample_rate': self.sample_rate,
+            'duration': self.duration,
+            'total_samples': self.total_samples,
+            'fft_size': self.fft_size,
+            'hop_length': self.hop_length,
+            'frequencies': self._freq_bins.copy(),
+            'num_time_frames': (self.total_samples - self.fft_size) // self.hop_length + 1
+        }
+
     def start(self) -> Dict[str, Any]:
         """
         Start the streaming analysis.
@@ -68,20 +168,7 @@ class SpectrumAnalyzer:
             raise RuntimeError("Analyzer is already running")
 
         # Load audio metadata first
-        try:
-            # Get duration without loading audio data
-            self.duration = librosa.get_duration(path=self.path)
-            
-            # Load a small sample to get sample rate
-            _, sr = librosa.load(self.path, sr=None, duration=0.1)
-            self.sample_rate = sr
-            self.total_samples = int(self.duration * self.sample_rate)
-
-            # Use Nyquist frequency
-            self._freq_bins = np.fft.rfftfreq(self.fft_size, 1 / self.sample_rate)
-
-        except Exception as e:
-            raise RuntimeError(f"Failed to load audio metadata: {e}")
+        metadata = self.load_metadata()
 
         # Start threads
         self.is_running = True
@@ -94,15 +181,7 @@ class SpectrumAnalyzer:
         self._reader_thread.start()
         self._worker_thread.start()
 
-        return {
-            'sample_rate': self.sample_rate,
-            'duration': self.duration,
-            'total_samples': self.total_samples,
-            'fft_size': self.fft_size,
-            'hop_length': self.hop_length,
-            'frequencies': self._freq_bins.copy(),
-            'num_time_frames': (self.total_samples - self.fft_size) // self.hop_length + 1
-        }
+        return metadata
 
     def stop(self) -> None:
         """Stop the streaming analysis."""
@@ -111,6 +190,12 @@ class SpectrumAnalyzer:
 
         self._stop_event.set()
         self.is_running = False
+        # Wake the FFT worker if it is blocked waiting for audio; a full queue means
+        # it is not, and it will see the stop event on its next batch
+        try:
+            self._audio_queue.put_nowait(None)
+        except queue.Full:
+            pass
 
         # Wait for threads to finish
         if self._reader_thread and self._reader_thread.is_alive():
@@ -121,46 +206,54 @@ class SpectrumAnalyzer:
     def _reader_worker(self) -> None:
         """
         Reader thread that loads audio data in chunks and feeds it to the FFT worker.
-        Sends batches of frames for vectorized FFT processing.
+        Frames are cut from each chunk as a zero-copy strided view and sent in batches.
         """
         try:
-            chunk_size = self.hop_length * 50  # Process 50 frames at a time
+            frames_per_chunk = max(50, self.batch_size)
+            chunk_size = self.hop_length * frames_per_chunk
             stream = librosa.stream(self.path, block_length=1, frame_length=chunk_size, 
                                   hop_length=chunk_size, mono=True)
-            buffer = np.array([])
+            # Samples carried over from the previous chunk (always < fft_size)
+            overlap = np.empty(0, dtype=np.float32)
             frame_index = 0
-            batch_frames = []
-            batch_indices = []
             for chunk in stream:
                 if self._stop_event.is_set():
                     break
                 if chunk.ndim > 1:
                     chunk = chunk.flatten()
-                buffer = np.concatenate([buffer, chunk])
-                while len(buffer) >= self.fft_size and not self._stop_event.is_set():
-                    frame = buffer[:self.fft_size].copy()
-                    batch_frames.append(frame)
-                    batch_indices.append(frame_index)
-                    frame_index += 1
-                    buffer = buffer[self.hop_length:]
-                    if len(batch_frames) >= self.batch_size:
-                        # Put batch in queue
-                        try:
-                            self._audio_queue.put((batch_indices.copy(), np.stack(batch_frames)), timeout=1.0)
-                        except queue.Full:
-                            pass
-                        batch_frames.clear()
-                        batch_indices.clear()
-            # Put any remaining frames
-            if batch_frames:
-                try:
-                    self._audio_queue.put((batch_indices.copy(), np.stack(batch_frames)), timeout=1.0)
-                except queue.Full:
-                    pass
-            self._audio_queue.put(None)
+                # Fresh block per chunk: queued frames are views into it
+                buffer = np.empty(len(overlap) + len(chunk), dtype=np.float32)
+                buffer[:len(overlap)] = overlap
+                buffer[len(overlap):] = chunk
+                if len(buffer) < self.fft_size:
+                    overlap = buffer
+                    continue
+                # One row per hop, all sharing the buffer memory
+                frames = sliding_window_view(buffer, self.fft_size)[::self.hop_length]
+                for start in range(0, len(frames), self.batch_size):
+                    if not self._put_audio((frame_index + start, frames[start:start + self.batch_size])):
+                        return
+                frame_index += len(frames)
+                overlap = buffer[len(frames) * self.hop_length:].copy()
+            self._put_audio(None)
         except Exception as e:
-            print(f"Reader thread error: {e}")
-            self._audio_queue.put(None)
+            logger.error("Reader thread error: %s", e)
+            self._put_audio(None)
+
+    def _put_audio(self, item) -> bool:
+        """
+        Queue an item for the FFT worker, waiting while the queue is full.
+
+        Returns:
+            False if the analysis was stopped before the item could be queued
+        """
+        while True:
+            try:
+                self._audio_queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                if self._stop_event.is_set():
+                    return False
 
     def _fft_worker(self) -> None:
         """
@@ -168,24 +261,34 @@ class SpectrumAnalyzer:
         Processes batches of frames for vectorized FFT and dB conversion.
         """
         try:
-            while not self._stop_event.is_set():
-                try:
-                    item = self._audio_queue.get(timeout=1.0)
-                    if item is None:
-                        break
-                    frame_indices, audio_frames = item
-                    # audio_frames: shape (batch, fft_size)
-                    windowed = audio_frames * self._window_func
-                    fft_result = np.fft.rfft(windowed, axis=1)
-                    power = np.abs(fft_result) ** 2
-                    n2 = self.fft_size * self.fft_size
-                    power = power / n2
-                    power = np.maximum(power, 1e-12)
-                    magnitudes_db = 10.0 * np.log10(power)
-                    for idx, frame_index in enumerate(frame_indices):
-                        self.callback(frame_index, magnitudes_db[idx])
-                except queue.Empty:
-                    continue  # Timeout, check stop event and continue
+            if pyfftw is not None and self._fft_plan is None:
+                # Plan once per analyzer, off the GUI thread; planning overwrites the scratch buffers
+                # and is near instant when the wisdom of an earlier run was loaded
+                self._fft_plan = pyfftw.FFTW(
+                    self._windowed_buf, self._spectrum_buf, axes=(-1,),
+                    flags=('FFTW_MEASURE', 'FFTW_DESTROY_INPUT'), threads=os.cpu_count() or 1)
+
+            while True:
+                item = self._audio_queue.get()
+                if item is None or self._stop_event.is_set():
+                    break
+                start_index, audio_frames = item
+                # audio_frames: shape (batch, fft_size)
+                # float32 in, complex64 out: half the bytes of the float64 path
+                windowed = self._windowed_buf[:len(audio_frames)]
+                np.multiply(audio_frames, self._window_func, out=windowed)
+                if self._fft_plan is not None:
+                    # One batched FFTW call; rows past a short final batch are ignored
+                    self._fft_plan.execute()
+                    fft_result = self._spectrum_buf[:len(audio_frames)]
+                else:
+                    # pocketfft splits the batch across all available cores
+                    fft_result = rfft(windowed, axis=1, workers=-1, overwrite_x=True)
+                # |X|^2, normalization, floor and dB in one fused pass over the spectrum
+                magnitudes_db = self._db_buf[:len(audio_frames)]
+                power_to_db(fft_result, 1.0 / (self.fft_size * self.fft_size), 1e-12, magnitudes_db)
+                # One call per batch; rows are consecutive frames from start_index
+                self.callback(start_index, magnitudes_db)
 
         except Exception as e:
             QMessageBox.critical(None, "Error", f"FFT worker thread error: {e}")
@@ -1,35 +1,52 @@
 """A module defining custom axis items for PyQtGraph plots."""
 
+import functools
+
+import numpy as np
 import pyqtgraph as pg
 
+# Zero-padded seconds fields, looked up instead of formatted for every tick
+_SECONDS = tuple(f"{s:02d}" for s in range(60))
+
+
+def _tick_key(values) -> tuple:
+    """Build a hashable cache key, rounding away floating point jitter."""
+    return tuple(round(float(v), 6) for v in values)
+
+
+@functools.lru_cache(maxsize=128)
+def _format_time_ticks(values: tuple) -> tuple:
+    """Format tick values in seconds as m:ss labels."""
+    # Split all ticks into minutes and seconds in one vectorized pass
+    arr = np.asarray(values, dtype=np.float64)
+    abs_vals = np.abs(arr)
+    minutes = (abs_vals // 60).astype(np.int64).tolist()
+    seconds = (abs_vals % 60).astype(np.int64).tolist()
+    signs = np.where(arr < 0, "-", "").tolist()
+    return tuple(f"{sign}{m}:{_SECONDS[s]}" for sign, m, s in zip(signs, minutes, seconds))
+
+
+@functools.lru_cache(maxsize=128)
+def _format_freq_ticks(values: tuple) -> tuple:
+    """Format tick values in Hz as kHz labels."""
+    # Classify all ticks with masks and format each class with one C-level call
+    arr = np.asarray(values, dtype=np.float64)
+    khz = arr / 1000.0
+    high = arr >= 1000
+    mid = (arr > 0) & ~high
+    labels = np.full(arr.shape, "0 kHz", dtype=object)
+    labels[high] = np.char.mod("%d kHz", khz[high].astype(np.int64)).tolist()
+    labels[mid] = np.char.mod("%.1f kHz", khz[mid]).tolist()
+    return tuple(labels.tolist())
+
 
 class TimeAxisItem(pg.AxisItem):
     """Custom axis item for displaying time in minutes and seconds format."""
     def tickStrings(self, values, scale, spacing):
-        result = []
-        for val in values:
-            if val < 0:
-                # Handle negative values
-                abs_val = abs(val)
-                minutes = int(abs_val // 60)
-                seconds = int(abs_val % 60)
-                result.append(f"-{minutes}:{seconds:02d}")
-            else:
-                minutes = int(val // 60)
-                seconds = int(val % 60)
-                result.append(f"{minutes}:{seconds:02d}")
-        return result
+        return list(_format_time_ticks(_tick_key(values)))
 
 
 class FreqAxisItem(pg.AxisItem):
     """Custom axis item for displaying frequency in kHz with unit."""
     def tickStrings(self, values, scale, spacing):
-        out = []
-        for val in values:
-            if val >= 1000:
-                out.append(f"{int(val/1000)} kHz")
-            elif val > 0:
-                out.append(f"{val/1000:.1f} kHz")
-            else:
-                out.append("0 kHz")
-        return out
\ No newline at end of file
+        return list(_format_freq_ticks(_tick_key(values)))
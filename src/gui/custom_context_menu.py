@@ -3,17 +3,123 @@
 import os
 from typing import Optional, Callable
 
-import humanize
 import numpy as np
-from pyqtgraph import colormap
-from mutagen import File as MutagenFile
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QContextMenuEvent
-from PySide6.QtWidgets import (QMenu, QWidget, QFileDialog, QTableWidget, QLabel, 
-                               QComboBox, QTableWidgetItem, QVBoxLayout, QCheckBox)
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QObject, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QContextMenuEvent, QImage, QImageWriter
+from PySide6.QtWidgets import (QMenu, QWidget, QFileDialog, QTableView, QLabel, 
+                               QComboBox, QVBoxLayout, QCheckBox)
 
 from .custom_title_bar import CustomTitleBar
 
+_PNG_COMPRESSION = 20
+
+
+def _read_audio_details(audio_path: str, metadata: dict) -> list[tuple[str, str]]:
+    """Read audio file details as (parameter, value) pairs."""
+    # Imported on first use to keep them off the GUI startup path
+    import humanize
+    from mutagen import File as MutagenFile
+
+    # Attempt to read metadata using Mutagen; a single easy-mode parse
+    # provides both the normalized tags and the stream info
+    try:
+        mf = MutagenFile(audio_path, easy=True)
+    except Exception:
+        mf = None
+    info = getattr(mf, 'info', None)
+
+    # Prepare details to display
+    details = []
+    ext = os.path.splitext(audio_path)[1][1:].upper()
+    details.append(("File name", os.path.basename(audio_path)))
+    details.append(("Format", ext))
+
+    duration = getattr(info, 'length', None) or metadata.get('duration', None)
+    if duration:
+        m, s = divmod(int(duration), 60)
+        details.append(("Duration", f"{m}:{s:02d}"))
+
+    sr = getattr(info, 'sample_rate', None) or metadata.get('sample_rate', None)
+    if sr:
+        details.append(("Sample rate", f"{sr} Hz"))
+
+    br = getattr(info, 'bitrate', None)
+    if br:
+        details.append(("Bitrate", f"{br//1000} kbps"))
+
+    ch = getattr(info, 'channels', None)
+    if ch:
+        details.append(("Channels", str(ch)))
+
+    codec = getattr(info, 'codec', None)
+    if codec:
+        details.append(("Codec", str(codec)))
+
+    bits = getattr(info, 'bits_per_sample', None)
+    if bits:
+        details.append(("Bits/sample", str(bits)))
+
+    try:
+        size = os.path.getsize(audio_path)
+        details.append(("File size", humanize.naturalsize(size)))
+    except Exception:
+        pass
+
+    if mf and hasattr(mf, 'tags') and mf.tags:
+        for tag in ("title", "artist", "album", "date", "tracknumber", 
+                    "genre", "composer", "albumartist", "comment"):
+            val = mf.tags.get(tag)
+            if val:
+                details.append((tag.capitalize(), ", ".join(val) if isinstance(val, list) else str(val)))
+
+    return details
+
+
+class DetailsModel(QAbstractTableModel):
+    """
+    Read-only table model over a list of (parameter, value) pairs.
+    The view reads cells lazily, so no per-cell items are allocated.
+    """
+    HEADERS = ("Parameter", "Value")
+
+    def __init__(self, rows: list[tuple[str, str]], parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self._rows = rows
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        return str(self._rows[index.row()][index.column()])
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role: int = Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+
+class _DetailsSignals(QObject):
+    """Signals emitted by the details worker."""
+    finished = Signal(list)
+
+
+class _DetailsWorker(QRunnable):
+    """Reads audio file details on a thread pool thread."""
+    def __init__(self, audio_path: str, metadata: dict, signals: _DetailsSignals):
+        super().__init__()
+        self.audio_path = audio_path
+        self.metadata = dict(metadata)
+        self.signals = signals
+
+    def run(self) -> None:
+        self.signals.finished.emit(_read_audio_details(self.audio_path, self.metadata))
+
+
 
 class CustomContextMenu:
     """
@@ -46,94 +152,87 @@ class CustomContextMenu:
     def exec(self, event: QContextMenuEvent) -> None:
         menu = QMenu(self.parent)
         export_action = menu.addAction("Export spectrogram to PNG")
+        export_gray_action = menu.addAction("Export spectrogram to grayscale PNG")
         details_action = menu.addAction("Show details")
         settings_action = menu.addAction("Settings")
         action = menu.exec(event.globalPos())
 
         if action == export_action:
             self._export_spectrogram_png()
+        elif action == export_gray_action:
+            self._export_spectrogram_grayscale_png()
         elif action == details_action:
             self._show_details_dialog()
         elif action == settings_action:
             self._show_settings_dialog()
 
-    def _export_spectrogram_png(self):
-        """Export the spectrogram as a PNG file."""
-        if self.spectrogram_data is None:
-            return
-
+    def _ask_export_path(self) -> str:
+        """Ask the user where to save the exported PNG file."""
         name = os.path.basename(self.audio_path).split('.')[0] if self.audio_path else "spectrogram"
         file_path, _ = QFileDialog.getSaveFileName(
             self.parent, "Export Spectrogram", f"{name}.png", "PNG Files (*.png)")
+        return file_path
 
+    def _write_png(self, qimg: QImage, file_path: str) -> None:
+        """Write the image as a PNG file."""
+        # Fast deflate: Qt's 0-100 compression scale maps 20 to zlib level 2,
+        # several times faster than the default for a slightly larger file
+        writer = QImageWriter(file_path, b"png")
+        writer.setCompression(_PNG_COMPRESSION)
+        writer.write(qimg)
+
+    def _export_spectrogram_png(self):
+        """Export the spectrogram as a PNG file, colored with the current colormap."""
+        if self.spectrogram_data is None:
+            return
+
+        file_path = self._ask_export_path()
         if not file_path:
             return
 
-        qimg = self.image_item.getPixmap().toImage()
-        if qimg is None:
+        # Color the full-resolution levels through the image item's lookup table; the
+        # item itself only holds the bins reduced to the plot height
+        levels = self._flipped_levels()
+        height, width = levels.shape
+        qimg = QImage(levels.data, width, height, width, QImage.Format.Format_Indexed8)
+        qimg.setColorTable(self._color_table())
+        self._write_png(qimg, file_path)
+
+    def _export_spectrogram_grayscale_png(self):
+        """Export the raw spectrogram data as an 8-bit grayscale PNG file."""
+        if self.spectrogram_data is None:
             return
 
-        # Flip the image vertically to match the expected orientation
-        qimg_flipped = qimg.mirrored(False, True)
-        qimg_flipped.save(file_path)
+        file_path = self._ask_export_path()
+        if not file_path:
+            return
+
+        # The 8-bit levels are written as is, skipping the colormap
+        gray = self._flipped_levels()
+        height, width = gray.shape
+        qimg = QImage(gray.data, width, height, width, QImage.Format.Format_Grayscale8)
+        self._write_png(qimg, file_path)
+
+    def _flipped_levels(self) -> np.ndarray:
+        """Return the frequency-major 8-bit levels with frequency running bottom to top."""
+        return np.ascontiguousarray(self.spectrogram_data[::-1], dtype=np.uint8)
+
+    def _color_table(self) -> list[int]:
+        """Build a 256-entry QImage color table from the image item's lookup table."""
+        lut = getattr(self.image_item, 'lut', None)
+        if not isinstance(lut, np.ndarray) or lut.ndim != 2 or len(lut) == 0:
+            # No usable lookup table: export gray levels
+            lut = np.repeat(np.arange(256, dtype=np.uint8)[:, None], 3, axis=1)
+        # Levels (0, 255) spread the 256 input values evenly over the table
+        lut = lut[np.arange(256) * len(lut) // 256].astype(np.uint32)
+        alpha = lut[:, 3] if lut.shape[1] > 3 else np.uint32(255)
+        return ((alpha << 24) | (lut[:, 0] << 16) | (lut[:, 1] << 8) | lut[:, 2]).tolist()
 
     def _show_details_dialog(self):
         """Show a dialog with audio file details."""
         if not self.audio_path or not os.path.isfile(self.audio_path):
             return
 
-        # Attempt to read metadata using Mutagen
-        try:
-            mf = MutagenFile(self.audio_path, easy=True)
-            mf_raw = MutagenFile(self.audio_path)
-        except Exception:
-            mf = None
-            mf_raw = None
-
-        # Prepare details to display
-        details = []
-        ext = os.path.splitext(self.audio_path)[1][1:].upper()
-        details.append(("File name", os.path.basename(self.audio_path)))
-        details.append(("Format", ext))
-
-        duration = getattr(mf_raw.info, 'length', None) or self.metadata.get('duration', None)
-        if duration:
-            m, s = divmod(int(duration), 60)
-            details.append(("Duration", f"{m}:{s:02d}"))
-
-        sr = getattr(mf_raw.info, 'sample_rate', None) or self.metadata.get('sample_rate', None)
-        if sr:
-            details.append(("Sample rate", f"{sr} Hz"))
-
-        br = getattr(mf_raw.info, 'bitrate', None)
-        if br:
-            details.append(("Bitrate", f"{br//1000} kbps"))
-
-        ch = getattr(mf_raw.info, 'channels', None)
-        if ch:
-            details.append(("Channels", str(ch)))
-
-        codec = getattr(mf_raw.info, 'codec', None)
-        if codec:
-            details.append(("Codec", str(codec)))
-
-        bits = getattr(mf_raw.info, 'bits_per_sample', None)
-        if bits:
-            details.append(("Bits/sample", str(bits)))
-
-        try:
-            size = os.path.getsize(self.audio_path)
-            details.append(("File size", humanize.naturalsize(size)))
-        except Exception:
-            pass
-
-        if mf and hasattr(mf, 'tags') and mf.tags:
-            for tag in ("title", "artist", "album", "date", "tracknumber", 
-                        "genre", "composer", "albumartist", "comment"):
-                val = mf.tags.get(tag)
-                if val:
-                    details.append((tag.capitalize(), ", ".join(val) if isinstance(val, list) else str(val)))
-
         # Create and show the details dialog
         dlg = QWidget(self.parent, Qt.Window | Qt.FramelessWindowHint)
 
@@ -151,27 +250,30 @@ class CustomContextMenu:
         content_layout = QVBoxLayout()
         content_layout.setContentsMargins(10, 0, 10, 10)
         content_layout.setSpacing(10)
-
-        table = QTableWidget(len(details), 2)
-        table.setHorizontalHeaderLabels(["Parameter", "Value"])
-
-        # Populate the table with details
-        for i, (k, v) in enumerate(details):
-            table.setItem(i, 0, QTableWidgetItem(str(k)))
-            table.setItem(i, 1, QTableWidgetItem(str(v)))
-
-        # Make headers occupy full width and hide the top-left corner
-        table.horizontalHeader().setStretchLastSection(True)
-        table.verticalHeader().setVisible(False)
-        table.setCornerButtonEnabled(False)
-        table.setEditTriggers(QTableWidget.NoEditTriggers)
-        content_layout.addWidget(table)
         content_widget.setLayout(content_layout)
 
         layout.addWidget(content_widget)
         dlg.setLayout(layout)
         dlg.show()
 
+        # Read metadata off the GUI thread and build the table when it arrives;
+        # the signals object is owned by the dialog and dies with it
+        signals = _DetailsSignals(dlg)
+        signals.finished.connect(lambda details: self._populate_details(content_layout, details))
+        QThreadPool.globalInstance().start(_DetailsWorker(self.audio_path, self.metadata, signals))
+
+    def _populate_details(self, content_layout: QVBoxLayout, details: list[tuple[str, str]]) -> None:
+        """Fill the details dialog content with a read-only view of the details."""
+        view = QTableView()
+        view.setModel(DetailsModel(details, view))
+
+        # Make headers occupy full width and hide the top-left corner
+        view.horizontalHeader().setStretchLastSection(True)
+        view.verticalHeader().setVisible(False)
+        view.setCornerButtonEnabled(False)
+        view.setEditTriggers(QTableView.NoEditTriggers)
+        content_layout.addWidget(view)
+
     def on_grid_toggled(self, checked):
         """Toggle the visibility of the grid on the plot."""
         self._show_grid = checked
@@ -182,10 +284,13 @@ class CustomContextMenu:
 
     def on_colormap_changed(self, name):
         """Change the colormap of the image item and colorbar."""
+        from pyqtgraph import colormap
+
         self._colormap = name
         cmap = colormap.get(name)
 
-        # Only update colormap if image_item and colorbar are both set
+        # Only update colormap if image_item and colorbar are both set; the
+        # colorbar is not linked to the image, so both need the new colormap
         if self.image_item is not None and self.colorbar is not None:
             self.image_item.setColorMap(cmap)
             self.colorbar.setColorMap(cmap)
@@ -1,9 +1,10 @@
 """A module containing the custom title bar for the SpectrumWeaver application."""
 
+from collections import OrderedDict
 from typing import TYPE_CHECKING
 
 from PySide6.QtCore import QSize, Qt
-from PySide6.QtGui import QIcon
+from PySide6.QtGui import QIcon, QPixmap
 from PySide6.QtWidgets import QHBoxLayout, QLabel, QVBoxLayout
 from qframelesswindow import TitleBar
 
@@ -29,7 +30,8 @@ class CustomTitleBar(TitleBar):
         self.hBoxLayout.removeWidget(self.maxBtn)
         self.hBoxLayout.removeWidget(self.closeBtn)
 
-        # Add window icon
+        # Add window icon, with scaled pixmaps cached per icon
+        self._icon_pix_cache: OrderedDict[int, QPixmap] = OrderedDict()
         self.iconLabel = QLabel(self)
         self.iconLabel.setFixedSize(32, 32)
         self.iconLabel.setAlignment(Qt.AlignmentFlag.AlignCenter)
@@ -67,9 +69,18 @@ class CustomTitleBar(TitleBar):
         self.hBoxLayout.addLayout(self.vBoxLayout, 0)
 
     def _set_title(self, title: str) -> None:
+        # setText() updates the label's size hint and the layout resizes it
         self.titleLabel.setText(title)
-        self.titleLabel.adjustSize()
 
     def _set_icon(self, icon: QIcon) -> None:
-        pixmap = icon.pixmap(QSize(28, 28))  # Slightly smaller than label for padding
-        self.iconLabel.setPixmap(pixmap.scaled(28, 28, Qt.KeepAspectRatio, Qt.SmoothTransformation))
+        key = icon.cacheKey()
+        scaled = self._icon_pix_cache.get(key)
+        if scaled is None:
+            pixmap = icon.pixmap(QSize(28, 28))  # Slightly smaller than label for padding
+            scaled = pixmap.scaled(28, 28, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            self._icon_pix_cache[key] = scaled
+            if len(self._icon_pix_cache) > 4:
+                self._icon_pix_cache.popitem(last=False)
+        else:
+            self._icon_pix_cache.move_to_end(key)
+        self.iconLabel.setPixmap(scaled)
@@ -1,17 +1,60 @@
 """A streaming spectrum viewer widget that displays spectrograms in real-time."""
 
-import threading
+import functools
 
 import numpy as np
 import pyqtgraph as pg
 
-from PySide6.QtCore import QTimer, Signal
-from PySide6.QtGui import QCloseEvent
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+from PySide6.QtGui import QCloseEvent, QGuiApplication, QResizeEvent
 from PySide6.QtWidgets import QStackedWidget, QWidget, QVBoxLayout
 
 from analyzers.spectrum_analyzer import SpectrumAnalyzer
 from .custom_context_menu import CustomContextMenu
 from .custom_axes_items import TimeAxisItem, FreqAxisItem
+from .streaming_image_item import StreamingImageItem
+
+# Default colormap and its lookup table, built once and shared by every viewer
+_VIRIDIS = pg.colormap.get('viridis')
+_VIRIDIS_LUT = _VIRIDIS.getLookupTable(0.0, 1.0, 256)
+
+
+class _AnalysisSignals(QObject):
+    """Signals used to hand analyzer metadata back to the GUI thread."""
+    ready = Signal(object, dict, np.ndarray)  # analyzer, metadata, spectrogram_data
+    failed = Signal(object, str)  # analyzer, error message
+
+
+class _AnalysisLoader(QRunnable):
+    """Reads the audio metadata and allocates the spectrogram off the GUI thread."""
+    def __init__(self, analyzer: SpectrumAnalyzer, signals: _AnalysisSignals) -> None:
+        super().__init__()
+        self.analyzer = analyzer
+        self.signals = signals
+
+    def run(self) -> None:
+        try:
+            metadata = self.analyzer.load_metadata()
+            # Initialize spectrogram data array at the noise floor (level 0)
+            num_time_frames = metadata['num_time_frames']
+            num_freq_bins = len(metadata['frequencies'])
+            spectrogram_data = np.zeros((num_freq_bins, num_time_frames), dtype=np.uint8)
+        except Exception as e:
+            self.signals.failed.emit(self.analyzer, str(e))
+        else:
+            self.signals.ready.emit(self.analyzer, metadata, spectrogram_data)
+
+
+class _QuantizeScratch:
+    """Float32 scratch space of one analyzer's thread, grown on demand and reused."""
+    def __init__(self) -> None:
+        self._buf: np.ndarray = None
+
+    def get(self, rows: int, cols: int) -> np.ndarray:
+        buf = self._buf
+        if buf is None or buf.shape[0] < rows or buf.shape[1] < cols:
+            buf = self._buf = np.empty((rows, cols), dtype=np.float32)
+        return buf[:rows, :cols]
 
 
 class SpectrumViewer(QWidget):
@@ -19,13 +62,19 @@ class SpectrumViewer(QWidget):
     A widget for displaying a streaming spectrogram of an audio file.
     This widget uses a streaming spectrum analyzer to process audio data
     in real-time and display the results progressively.
-    It supports thread-safe updates using Qt signals to ensure smooth UI performance.
+    Analyzer batches are written into a shared array and picked up by a refresh timer.
     The spectrogram is displayed using PyQtGraph's ImageItem for efficient rendering.
     The widget automatically configures its axes based on the audio metadata
-    and updates the display at a maximum rate of 60 FPS.
+    and updates the display at most once per refresh of the screen it is on.
     """
+    SUPPORTED_FORMATS: frozenset[str] = frozenset({".wav", ".mp3", ".flac", ".ogg", ".m4a", ".aac"})
+    DB_LEVELS = (-120.0, 0.0)  # dB range quantized to 0-255 in spectrogram_data
+    # spectrogram_data is frequency-major, (num_freq_bins, num_time_frames), so that each
+    # frequency row is contiguous in time and the image can be rendered without a copy
+    _DB_SCALE = 255.0 / (DB_LEVELS[1] - DB_LEVELS[0])
+    _DB_OFFSET = -DB_LEVELS[0] * _DB_SCALE
+
     # Signals for thread-safe communication
-    frame_received = Signal(int, np.ndarray)  # frame_index, magnitudes_db
     analysis_complete = Signal()
  
     def __init__(self, parent: QStackedWidget, path: str = None) -> None:
@@ -34,12 +83,26 @@ class SpectrumViewer(QWidget):
         self.audio_path = path
         self.analyzer: SpectrumAnalyzer = None
         self.spectrogram_data: np.ndarray = None
-        self.data_lock = threading.Lock()
+        self.display_data: np.ndarray = None  # spectrogram_data max-held down to the plot height
+        self._bin_starts: np.ndarray = None
         self.metadata: dict = {}
         self._last_displayed_frame = 0
+        self._dirty_end = 0  # only ever advanced by the current analyzer's thread
+
+        # Redraws are coalesced through a single timer instead of one per batch
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.timeout.connect(self._update_display)
 
-        # Connect signals
-        self.frame_received.connect(self._on_frame_received)
+        # Resizes and zooms are debounced before the display bins are rebuilt
+        self._display_timer = QTimer(self)
+        self._display_timer.setSingleShot(True)
+        self._display_timer.setInterval(100)
+        self._display_timer.timeout.connect(self._rebuild_display)
+
+        # Metadata is read on a pool thread so that loading never blocks the window
+        self._analysis_signals = _AnalysisSignals(self)
+        self._analysis_signals.ready.connect(self._on_analysis_ready)
+        self._analysis_signals.failed.connect(self._on_analysis_failed)
 
         # UI components
         self.plot_widget = None
@@ -81,8 +144,9 @@ class SpectrumViewer(QWidget):
         self.plot_widget.setBackground('#202020')
 
         # Create the image item for the spectrogram
-        self.image_item = pg.ImageItem()
+        self.image_item = StreamingImageItem()
         self.plot_widget.addItem(self.image_item)
+        self.plot_widget.getPlotItem().getViewBox().sigYRangeChanged.connect(self._schedule_display_rebuild)
         main_layout.addWidget(self.plot_widget)
 
         # Configure the plot
@@ -97,17 +161,19 @@ class SpectrumViewer(QWidget):
         self.plot_widget.setYRange(0, 22050)
         
         # Set color map
-        cmap = pg.colormap.get('viridis')
-        self.image_item.setColorMap(cmap)
+        self.image_item.setLookupTable(_VIRIDIS_LUT)
 
-        # Add color bar for dB scale
+        # Add color bar for dB scale; it only labels the scale, so it is placed
+        # next to the plot without being linked to the quantized image levels
         self.color_bar = pg.ColorBarItem(
-            values=(-120, 0),
-            colorMap=cmap,
+            values=self.DB_LEVELS,
+            colorMap=_VIRIDIS,
             label='dB',
             interactive=False
         )
-        self.color_bar.setImageItem(self.image_item, insert_in=self.plot_widget.getPlotItem())
+        plot_layout = self.plot_widget.getPlotItem().layout
+        plot_layout.addItem(self.color_bar, 2, 5)  # after the right-hand axis
+        plot_layout.setColumnFixedWidth(4, 5)
 
         if self.audio_path:
             #self.plot_widget.setTitle(self.audio_path)
@@ -149,7 +215,7 @@ class SpectrumViewer(QWidget):
         )
 
     def _start_analysis(self) -> None:
-        """Start the streaming spectrum analysis."""
+        """Start the streaming spectrum analysis once the audio metadata is loaded."""
         if not self.audio_path:
             return
         try:
@@ -157,54 +223,99 @@ class SpectrumViewer(QWidget):
             batch_size = self.context_menu.get_batch_size() if self.context_menu else 16
             
             # Create analyzer with optimized parameters (using Hann window)
-            self.analyzer = SpectrumAnalyzer(
+            analyzer = SpectrumAnalyzer(
                 path=self.audio_path,
-                callback=self._on_fft_result_threaded,
+                callback=None,
                 fft_size=2048,
                 hop_length=512,
                 batch_size=batch_size
             )
+            # Bind the callback to this analyzer with its own scratch space, so that a
+            # worker which outlives stop() can be recognized and its frames dropped
+            analyzer.callback = functools.partial(self._on_fft_result_threaded, analyzer, _QuantizeScratch())
+            self.analyzer = analyzer
+
+        except Exception as e:
+            self.plot_widget.setTitle(f"Error: {str(e)}")
+            return
 
-            # Start analysis and get metadata
-            self.metadata = self.analyzer.start()
+        QThreadPool.globalInstance().start(_AnalysisLoader(self.analyzer, self._analysis_signals))
 
-            # Initialize spectrogram data array with noise floor value
-            num_time_frames = self.metadata['num_time_frames']
-            num_freq_bins = len(self.metadata['frequencies'])
-            self.spectrogram_data = np.full((num_time_frames, num_freq_bins), -140.0, dtype=np.float32)
+    def _on_analysis_ready(self, analyzer: SpectrumAnalyzer, metadata: dict, spectrogram_data: np.ndarray) -> None:
+        """Set up the display for the loaded file and start its analysis."""
+        # A newer file may have been loaded while this one was being probed
+        if analyzer is not self.analyzer:
+            return
+        try:
+            self.metadata = metadata
+            self._dirty_end = 0
+            self.spectrogram_data = spectrogram_data
             self._last_displayed_frame = 0
+            self.display_data = spectrogram_data
+            self._bin_starts = None
+            self._bind_image()
 
             # Configure plot axes based on metadata
             self._configure_axes()
 
+            # Start analysis only now, so no frame arrives before the array exists
+            analyzer.start()
+            self._refresh_timer.start(self._refresh_interval_ms())
+
         except Exception as e:
             self.plot_widget.setTitle(f"Error: {str(e)}")
 
-    def _on_fft_result_threaded(self, frame_index: int, magnitudes_db: np.ndarray) -> None:
+    def _on_analysis_failed(self, analyzer: SpectrumAnalyzer, message: str) -> None:
+        """Report a file whose metadata could not be loaded."""
+        if analyzer is self.analyzer:
+            self.plot_widget.setTitle(f"Error: {message}")
+
+    def _refresh_interval_ms(self) -> int:
+        """Derive the redraw interval from the refresh rate of the widget's screen."""
+        screen = self.screen() or QGuiApplication.primaryScreen()
+        hz = screen.refreshRate() if screen else 0.0
+        return int(1000.0 / max(30.0, hz or 60.0))
+
+    def _on_fft_result_threaded(self, analyzer: SpectrumAnalyzer, scratch: _QuantizeScratch,
+                                frame_index: int, magnitudes_db: np.ndarray) -> None:
         """
         Thread-safe callback function called by the streaming analyzer.
-        This emits Qt signals to ensure UI updates happen on the main thread.
+        Batches are written straight into the spectrogram; the refresh timer
+        picks them up on the main thread. Batches of a replaced analyzer are dropped.
         """
+        # Read the array before checking the analyzer: a new file's array is only
+        # installed after self.analyzer was replaced, so a stale worker never gets it
+        spectrogram_data = self.spectrogram_data
+        if analyzer is not self.analyzer:
+            return
         if frame_index == -1:  # End of processing signal
             QTimer.singleShot(0, self._on_analysis_complete)
         else:
-            self.frame_received.emit(frame_index, magnitudes_db)
+            self._store_frames(analyzer, scratch, spectrogram_data, frame_index, magnitudes_db)
 
-    def _on_frame_received(self, frame_index: int, magnitudes_db: np.ndarray) -> None:
-        """
-        Main thread handler for FFT results.
-        This is called via Qt signal from the worker thread.
-        """
-        if self.spectrogram_data is None:
+    def _store_frames(self, analyzer: SpectrumAnalyzer, scratch: _QuantizeScratch,
+                      spectrogram_data: np.ndarray, frame_index: int, magnitudes_db: np.ndarray) -> None:
+        """Copy a batch of FFT results starting at frame_index into the spectrogram."""
+        if spectrogram_data is None:
             return
-        if 0 <= frame_index < self.spectrogram_data.shape[0]:
-            # Only lock for the row update
-            with self.data_lock:
-                end_idx = min(len(magnitudes_db), self.spectrogram_data.shape[1])
-                self.spectrogram_data[frame_index, :end_idx] = magnitudes_db[:end_idx]
-                self._last_displayed_frame = max(self._last_displayed_frame, frame_index + 1)
-
-        QTimer.singleShot(0, self._update_display)
+        num_frames = spectrogram_data.shape[1]
+        if 0 <= frame_index < num_frames:
+            end_row = min(frame_index + len(magnitudes_db), num_frames)
+            end_idx = min(magnitudes_db.shape[1], spectrogram_data.shape[0])
+            # Quantize the dB values to the 256 levels the colormap can show,
+            # in a scratch buffer that is reused for every batch
+            num_rows = end_row - frame_index
+            levels = scratch.get(num_rows, end_idx)
+            np.multiply(magnitudes_db[:num_rows, :end_idx], self._DB_SCALE, out=levels)
+            levels += self._DB_OFFSET
+            np.clip(levels, 0, 255, out=levels)
+            spectrogram_data[:end_idx, frame_index:end_row] = levels.T
+            # Publish the rows only after they are written. The current analyzer's
+            # thread is the single producer and the GUI only reads rows below
+            # _dirty_end, so the int store is enough and neither side takes a lock;
+            # the analyzer is checked again in case it was replaced mid-batch
+            if analyzer is self.analyzer and end_row > self._dirty_end:
+                self._dirty_end = end_row
 
     def _update_display(self) -> None:
         """
@@ -214,33 +325,88 @@ class SpectrumViewer(QWidget):
         if self.spectrogram_data is None or not self.metadata:
             return
 
-        # Display only the frames that have been processed so far
-        current_data = self.spectrogram_data[:self._last_displayed_frame]
-        self.image_item.setImage(current_data, levels=(-120, 0), autoRange=False)
-        duration = self.metadata['duration']
+        # Skip the redraw when no new frames arrived since the last one
+        dirty_end = self._dirty_end
+        if dirty_end == self._last_displayed_frame:
+            return
+        start = self._last_displayed_frame
+        self._reduce_frames(start, dirty_end)
+        self._last_displayed_frame = dirty_end
+
+        # The image item already holds the array; only the new frames are redrawn
+        self.image_item.updateFrames(start, dirty_end)
+
+    def _reduce_frames(self, start: int, end: int) -> None:
+        """Max-hold spectrogram frames [start, end) into the display bins."""
+        if self.display_data is not self.spectrogram_data:
+            self.display_data[:, start:end] = np.maximum.reduceat(
+                self.spectrogram_data[:, start:end], self._bin_starts, axis=0)
+
+    def _display_bin_count(self) -> int:
+        """Number of frequency bins the plot can show at its current height and zoom."""
+        num_bins = self.spectrogram_data.shape[0]
+        view_box = self.plot_widget.getPlotItem().getViewBox()
+        height = view_box.height()
+        y_min, y_max = view_box.viewRange()[1]
         frequencies = self.metadata['frequencies']
+        if height <= 0 or y_max <= y_min:
+            return num_bins
+        full_extent = frequencies[-1] - frequencies[0]
+        return int(min(num_bins, np.ceil(height * full_extent / (y_max - y_min))))
+
+    def _schedule_display_rebuild(self, *args) -> None:
+        """Rebuild the display bins once resizing or zooming settles."""
+        self._display_timer.start()
 
-        time_extent = duration
-        if self.spectrogram_data is not None:
-            time_extent *= (self._last_displayed_frame / self.spectrogram_data.shape[0])
+    def _rebuild_display(self) -> None:
+        """Resize the display bins to the plot and re-bind the image item."""
+        if self.spectrogram_data is None or not self.metadata:
+            return
+
+        num_bins = self._display_bin_count()
+        if num_bins == self.display_data.shape[0]:
+            return
+
+        if num_bins == self.spectrogram_data.shape[0]:
+            self.display_data = self.spectrogram_data
+        else:
+            self._bin_starts = np.linspace(0, self.spectrogram_data.shape[0], num_bins + 1).astype(np.intp)[:-1]
+            self.display_data = np.zeros((num_bins, self.spectrogram_data.shape[1]), dtype=np.uint8)
+            self._reduce_frames(0, self._last_displayed_frame)
+        self._bind_image()
+
+    def _bind_image(self) -> None:
+        """Hand the whole preallocated display array to the image item."""
+        self.image_item.setImage(self.display_data, levels=(0, 255), autoRange=False, axisOrder='row-major')
+        duration = self.metadata['duration']
+        frequencies = self.metadata['frequencies']
 
         rect = [
             0,  # x start (time=0)
             frequencies[0],  # y start (lowest freq, bottom of display)
-            time_extent,  # width (time extent so far)
+            duration,  # width (full time extent)
             frequencies[-1] - frequencies[0]  # height (freq extent)
         ]
         self.image_item.setRect(*rect)
 
     def _on_analysis_complete(self) -> None:
         """Called when streaming analysis is complete."""
+        # A stale end signal from a replaced analyzer must not stop the new run's timer
+        if self.analyzer is None or self.analyzer.is_finished:
+            self._refresh_timer.stop()
         self._update_display()
         self.analysis_complete.emit()
 
+    def resizeEvent(self, event: QResizeEvent) -> None:
+        super().resizeEvent(event)
+        self._schedule_display_rebuild()
+
     def closeEvent(self, event: QCloseEvent) -> None:
         """Clean up when the widget is closed."""
+        self._refresh_timer.stop()
         if self.analyzer:
             self.analyzer.stop()
+            self.analyzer = None  # also discards a load that is still in flight
         super().closeEvent(event)
 
     def load_audio(self, path: str):
@@ -249,6 +415,7 @@ class SpectrumViewer(QWidget):
         if self.analyzer:
             self.analyzer.stop()
             self.analyzer = None
+        self._refresh_timer.stop()
 
         self.spectrogram_data = None
         self.metadata = {}
@@ -259,24 +426,28 @@ class SpectrumViewer(QWidget):
         self.plot_widget.setTitle("C:\\Users\\User\\SpectrumWeaver.mp3")
         self.image_item.clear()
 
-        # Start new analysis
+        # Start new analysis; axes and limits are updated once the file is loaded
         self._start_analysis()
 
-        # Ensure axes and limits are updated for new file
-        self._configure_axes()
+    @classmethod
+    def _is_supported_audio_file(cls, file_path: str) -> bool:
+        """Check the file extension against the supported audio formats."""
+        # Lowercase only the extension rather than the whole path
+        i = file_path.rfind('.')
+        return i >= 0 and file_path[i:].lower() in cls.SUPPORTED_FORMATS
 
     def dragEnterEvent(self, event):
         if event.mimeData().hasUrls():
             # Accept only if at least one file is an audio file
             for url in event.mimeData().urls():
-                if url.isLocalFile() and url.toLocalFile().lower().endswith((".wav", ".mp3", ".flac", ".ogg", ".m4a", ".aac")):
+                if url.isLocalFile() and self._is_supported_audio_file(url.toLocalFile()):
                     event.acceptProposedAction()
                     return
         event.ignore()
 
     def dropEvent(self, event):
         for url in event.mimeData().urls():
-            if url.isLocalFile() and url.toLocalFile().lower().endswith((".wav", ".mp3", ".flac", ".ogg", ".m4a", ".aac")):
+            if url.isLocalFile() and self._is_supported_audio_file(url.toLocalFile()):
                 self.load_audio(url.toLocalFile())
                 break
         event.accept()
@@ -293,6 +464,7 @@ class SpectrumViewer(QWidget):
         if self.analyzer:
             self.analyzer.stop()
             self.analyzer = None
+        self._refresh_timer.stop()
         
         # Clear existing data
         self.spectrogram_data = None
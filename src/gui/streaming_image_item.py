@@ -0,0 +1,47 @@
+"""A module defining an image item for spectrograms that grow frame by frame."""
+
+import numpy as np
+import pyqtgraph as pg
+from PySide6.QtCore import QRectF
+from PySide6.QtGui import QImage
+
+
+class StreamingImageItem(pg.ImageItem):
+    """
+    Image item for a preallocated 8-bit image that is filled in column by column.
+    After the first full render, new frames are only repainted: a row-major
+    contiguous image is rendered straight from its own memory, and otherwise the
+    frames are copied into the indexed QImage buffer instead of a full rebuild.
+    """
+    def updateFrames(self, start: int, end: int) -> None:
+        """Show frames [start, end) of the bound image, which were written in place."""
+        buffer = self._qimage_buffer()
+        if buffer is None:
+            # Nothing reusable has been rendered yet; fall back to a full render
+            self.updateImage()
+            return
+
+        if not np.shares_memory(buffer, self.image):
+            if self.axisOrder == 'row-major':
+                buffer[:, start:end] = self.image[:, start:end]
+            else:
+                buffer[:, start:end] = self.image[start:end].T
+        self.update(QRectF(start, 0, end - start, buffer.shape[0]))
+
+    def _qimage_buffer(self):
+        """Return the array behind the rendered QImage if it can be patched in place."""
+        # _renderRequired is pyqtgraph-private; if it goes away, fall back to full renders
+        if getattr(self, '_renderRequired', True) or self.qimage is None or self.image is None:
+            return None
+        if self.qimage.format() != QImage.Format.Format_Indexed8:
+            return None
+        if self.autoDownsample or self.image.dtype != np.uint8:
+            return None
+
+        # pyqtgraph keeps the contiguous array it rendered from on the QImage; that is
+        # the image itself when it was already row-major and contiguous
+        buffer = getattr(self.qimage, 'data', None)
+        shape = self.image.shape if self.axisOrder == 'row-major' else self.image.shape[::-1]
+        if not isinstance(buffer, np.ndarray) or buffer.shape != shape:
+            return None
+        return buffer
@@ -1,17 +1,31 @@
 """A module containing the main application class for SpectrumWeaver."""
 
+import logging
 import sys
 from pathlib import Path
 
-from PySide6.QtCore import QFile, QTextStream
+from PySide6.QtCore import QFile, QStandardPaths, QTextStream
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import QApplication, QHBoxLayout, QStackedWidget, QMessageBox
 from qframelesswindow import FramelessWindow
 
+from analyzers.spectrum_analyzer import load_fftw_wisdom, save_fftw_wisdom
 from assets import resources  # noqa: F401
 from gui.custom_title_bar import CustomTitleBar
 from gui.spectrum_viewer import SpectrumViewer
 
+logger = logging.getLogger(__name__)
+
+_FALLBACK_QSS = """
+    QWidget {
+        background-color: rgb(32, 32, 32);
+        color: white;
+    }
+    SpectrumWeaver {
+        background-color: rgb(32, 32, 32);
+    }
+"""
+
 
 class SpectrumWeaver(FramelessWindow):
     """
@@ -20,6 +34,8 @@ class SpectrumWeaver(FramelessWindow):
     title bar and window frame. Sets up the layout and initializes
     the spectrum viewer for file handling.
     """
+    _qss_cache: str | None = None
+
     def __init__(self) -> None:
         super().__init__()
         self.setTitleBar(CustomTitleBar(self))
@@ -45,6 +61,13 @@ class SpectrumWeaver(FramelessWindow):
         self.resize(640, 480)
 
     def _set_qss(self) -> None:
+        # The stylesheet is read once per process and shared by every window
+        if SpectrumWeaver._qss_cache is None:
+            SpectrumWeaver._qss_cache = self._load_qss()
+        self.setStyleSheet(SpectrumWeaver._qss_cache)
+
+    @staticmethod
+    def _load_qss() -> str:
         try:
             # First try to load from Qt resources (works in both dev and packaged)
             qss_file = QFile(":/styles/styles.qss")
@@ -52,51 +75,29 @@ class SpectrumWeaver(FramelessWindow):
                 stream = QTextStream(qss_file)
                 stylesheet_content = stream.readAll()
                 qss_file.close()
-                self.setStyleSheet(stylesheet_content)
-                print("Loaded stylesheet from Qt resources")
-                return
+                logger.debug("Loaded stylesheet from Qt resources")
+                return stylesheet_content
             
-            # Fallback to file system paths
-            stylesheet_paths = [
+            # Fallback to file system paths, stopping at the first one that exists
+            stylesheet_paths = (
                 Path("assets/styles.qss"),  # Packaged environment
                 Path("src/assets/styles.qss"),  # Development environment
                 Path(__file__).parent / "assets" / "styles.qss",  # Relative to this file
-            ]
-            
-            stylesheet_content = None
-            for stylesheet_path in stylesheet_paths:
-                if stylesheet_path.exists():
-                    with stylesheet_path.open(encoding="utf-8") as f:
-                        stylesheet_content = f.read()
-                    print(f"Loaded stylesheet from file: {stylesheet_path}")
-                    break
+            )
+            stylesheet_path = next((path for path in stylesheet_paths if path.exists()), None)
             
-            if stylesheet_content:
-                self.setStyleSheet(stylesheet_content)
-            else:
-                print("Warning: No stylesheet found, using default styling")
-                # Apply basic dark theme as fallback
-                self.setStyleSheet("""
-                    QWidget {
-                        background-color: rgb(32, 32, 32);
-                        color: white;
-                    }
-                    SpectrumWeaver {
-                        background-color: rgb(32, 32, 32);
-                    }
-                """)
+            if stylesheet_path is not None:
+                with stylesheet_path.open(encoding="utf-8") as f:
+                    stylesheet_content = f.read()
+                logger.debug("Loaded stylesheet from file: %s", stylesheet_path)
+                return stylesheet_content
+
+            logger.warning("No stylesheet found, using default styling")
         except Exception as e:
-            print(f"Error loading stylesheet: {e}")
-            # Apply basic dark theme as fallback
-            self.setStyleSheet("""
-                QWidget {
-                    background-color: rgb(32, 32, 32);
-                    color: white;
-                }
-                SpectrumWeaver {
-                    background-color: rgb(32, 32, 32);
-                }
-            """)
+            logger.error("Error loading stylesheet: %s", e)
+
+        # Apply basic dark theme as fallback
+        return _FALLBACK_QSS
 
     def show_spectrum_viewer(self, path: str) -> None:
         """
@@ -111,6 +112,14 @@ class SpectrumWeaver(FramelessWindow):
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    app.setApplicationName("SpectrumWeaver")
+
+    # Reuse FFT plans measured in earlier sessions
+    wisdom_path = Path(QStandardPaths.writableLocation(
+        QStandardPaths.StandardLocation.AppConfigLocation)) / "fftw.wisdom"
+    load_fftw_wisdom(wisdom_path)
+    app.aboutToQuit.connect(lambda: save_fftw_wisdom(wisdom_path))
+
     spectrum_weaver = SpectrumWeaver()
     spectrum_weaver.show()
     app.exec()
@@ -1,23 +1,22 @@
 """Tests for the SpectrumAnalyzer class."""
 
-import tempfile
-from collections.abc import Generator
+import threading
 from pathlib import Path
 from unittest.mock import Mock, patch
 
 import numpy as np
 import pytest
 
+from src.analyzers import spectrum_analyzer
 from src.analyzers.spectrum_analyzer import SpectrumAnalyzer
 
 
-@pytest.fixture
-def mock_audio_file() -> Generator[str, None, None]:
-    """Fixture to create a temporary audio file path."""
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-        yield tmp_file.name
-    # Cleanup
-    Path(tmp_file.name).unlink(missing_ok=True)
+@pytest.fixture(scope="session")
+def mock_audio_file(tmp_path_factory: pytest.TempPathFactory) -> str:
+    """Fixture to create an empty audio file path, shared by the whole session."""
+    path = tmp_path_factory.mktemp("audio") / "mock.wav"
+    path.touch()
+    return str(path)
 
 
 @pytest.fixture
@@ -35,12 +34,10 @@ def mock_librosa_get_duration():
 
 
 @pytest.fixture
-def mock_librosa_load():
-    """Fixture to mock librosa.load function."""
-    with patch('src.analyzers.spectrum_analyzer.librosa.load') as mock:
-        # Return dummy audio data and sample rate
-        audio_data = np.random.random(44100)  # 1 second of random audio at 44100 Hz
-        mock.return_value = (audio_data, 44100)
+def mock_librosa_get_samplerate():
+    """Fixture to mock librosa.get_samplerate function."""
+    with patch('src.analyzers.spectrum_analyzer.librosa.get_samplerate') as mock:
+        mock.return_value = 44100
         yield mock
 
 
@@ -88,13 +85,13 @@ class TestSpectrumAnalyzer:
         assert analyzer.batch_size == 32
 
     def test_start_method(self, mock_audio_file: str, mock_callback: Mock, 
-                         mock_librosa_get_duration: Mock, mock_librosa_load: Mock) -> None:
+                         mock_librosa_get_duration: Mock, mock_librosa_get_samplerate: Mock) -> None:
         """Test the start method loads metadata correctly."""
         analyzer = SpectrumAnalyzer(mock_audio_file, mock_callback)
 
         # Mock the metadata loading
         mock_librosa_get_duration.return_value = 10.0
-        mock_librosa_load.return_value = (np.random.random(44100), 44100)
+        mock_librosa_get_samplerate.return_value = 44100
 
         metadata = analyzer.start()
 
@@ -115,7 +112,22 @@ class TestSpectrumAnalyzer:
 
         # Verify librosa calls
         mock_librosa_get_duration.assert_called_once_with(path=mock_audio_file)
-        mock_librosa_load.assert_called_once_with(mock_audio_file, sr=None, duration=0.1)
+        mock_librosa_get_samplerate.assert_called_once_with(mock_audio_file)
+
+    def test_load_metadata_without_starting(self, mock_audio_file: str, mock_callback: Mock,
+                                            mock_librosa_get_duration: Mock, mock_librosa_get_samplerate: Mock) -> None:
+        """Test that metadata can be read up front and the header is probed only once."""
+        analyzer = SpectrumAnalyzer(mock_audio_file, mock_callback)
+        mock_librosa_get_duration.return_value = 10.0
+        mock_librosa_get_samplerate.return_value = 44100
+
+        first = analyzer.load_metadata()
+        second = analyzer.load_metadata()
+
+        assert not analyzer.is_running
+        assert first['num_time_frames'] == second['num_time_frames'] == (441000 - 2048) // 512 + 1
+        mock_librosa_get_duration.assert_called_once_with(path=mock_audio_file)
+        mock_librosa_get_samplerate.assert_called_once_with(mock_audio_file)
 
     def test_stop_method(self, mock_audio_file: str, mock_callback: Mock) -> None:
         """Test the stop method."""
@@ -130,14 +142,44 @@ class TestSpectrumAnalyzer:
 
         assert not analyzer.is_running
 
+    def test_stop_with_full_queue(self, mock_callback: Mock) -> None:
+        """Test that stop() returns promptly when the audio queue is full."""
+        analyzer = SpectrumAnalyzer("test.wav", mock_callback)
+        while not analyzer._audio_queue.full():
+            analyzer._audio_queue.put_nowait((0, np.zeros((1, analyzer.fft_size))))
+        analyzer.is_running = True
+
+        analyzer.stop()
+
+        assert not analyzer.is_running
+        assert analyzer._stop_event.is_set()
+
+    def test_reader_waits_for_fft_worker(self, mock_callback: Mock, mock_librosa_stream: Mock) -> None:
+        """Test that the reader blocks on a full queue instead of buffering the whole file."""
+        analyzer = SpectrumAnalyzer("test.wav", mock_callback, fft_size=256, hop_length=64, batch_size=8)
+        mock_librosa_stream.return_value = iter([np.zeros(64 * 50, dtype=np.float32)] * 100)
+        reader = threading.Thread(target=analyzer._reader_worker, daemon=True)
+        reader.start()
+
+        # The reader fills the queue and then waits for the worker
+        reader.join(timeout=0.5)
+        assert reader.is_alive()
+        assert analyzer._audio_queue.full()
+
+        # A stop request releases it without queueing anything else
+        analyzer._stop_event.set()
+        reader.join(timeout=1.0)
+        assert not reader.is_alive()
+        assert analyzer._audio_queue.qsize() == analyzer._audio_queue.maxsize
+
     def test_already_running_error(self, mock_audio_file: str, mock_callback: Mock,
-                                  mock_librosa_get_duration: Mock, mock_librosa_load: Mock) -> None:
+                                  mock_librosa_get_duration: Mock, mock_librosa_get_samplerate: Mock) -> None:
         """Test that starting an already running analyzer raises error."""
         analyzer = SpectrumAnalyzer(mock_audio_file, mock_callback)
 
         # Mock first start
         mock_librosa_get_duration.return_value = 5.0
-        mock_librosa_load.return_value = (np.random.random(22050), 22050)
+        mock_librosa_get_samplerate.return_value = 22050
 
         analyzer.start()
 
@@ -172,6 +214,14 @@ class TestSpectrumAnalyzer:
 
         assert analyzer.hop_length == 2048  # 8192 // 4
 
+    def test_fft_size_rounded_to_fast_length(self, mock_audio_file: str, mock_callback: Mock) -> None:
+        """Test that awkward FFT sizes are rounded up to a fast FFT length."""
+        analyzer = SpectrumAnalyzer(mock_audio_file, mock_callback, fft_size=1021)
+
+        assert analyzer.fft_size == 1024
+        assert analyzer.hop_length == 256
+        assert len(analyzer._window_func) == 1024
+
     def test_different_file_paths(self, mock_callback: Mock) -> None:
         """Test initialization with different file paths."""
         test_paths = [
@@ -185,3 +235,71 @@ class TestSpectrumAnalyzer:
         for path in test_paths:
             analyzer = SpectrumAnalyzer(path, mock_callback)
             assert analyzer.path == path
+
+    def test_window_shared_between_instances(self, mock_callback: Mock) -> None:
+        """Test that analyzers with the same FFT size share one read-only window."""
+        first = SpectrumAnalyzer("a.wav", mock_callback, fft_size=1024)
+        second = SpectrumAnalyzer("b.wav", mock_callback, fft_size=1024)
+
+        assert first._window_func is second._window_func
+        assert not first._window_func.flags.writeable
+
+    @pytest.mark.parametrize("use_fftw", [True, False])
+    def test_fft_worker_power_spectrum(self, mock_callback: Mock, use_fftw: bool) -> None:
+        """Test that the FFT worker emits the normalized power spectrum in dB, with and without FFTW."""
+        if use_fftw and spectrum_analyzer.pyfftw is None:
+            pytest.skip("pyFFTW is not installed")
+        with patch.object(spectrum_analyzer, 'pyfftw', spectrum_analyzer.pyfftw if use_fftw else None):
+            # A batch shorter than batch_size, as at the end of a file
+            analyzer = SpectrumAnalyzer("test.wav", mock_callback, fft_size=256, batch_size=3)
+            frames = np.random.default_rng(0).uniform(-1, 1, (2, 256))
+            analyzer._audio_queue.put((0, frames.copy()))
+            analyzer._audio_queue.put(None)
+
+            analyzer._fft_worker()
+
+        assert (analyzer._fft_plan is not None) == use_fftw
+        spectrum = np.fft.rfft(frames * analyzer._window_func, axis=1)
+        expected = 10.0 * np.log10(np.maximum(np.abs(spectrum) ** 2 / 256 ** 2, 1e-12))
+        calls = mock_callback.call_args_list
+        assert [c.args[0] for c in calls] == [0, -1]
+        assert calls[0].args[1].dtype == np.float32
+        np.testing.assert_allclose(calls[0].args[1], expected, rtol=1e-4, atol=1e-3)
+        assert analyzer.is_finished
+
+    def test_reader_worker_frames(self, mock_callback: Mock, mock_librosa_stream: Mock) -> None:
+        """Test that the reader slices the stream into hop-spaced frames across chunks."""
+        analyzer = SpectrumAnalyzer("test.wav", mock_callback, fft_size=256, hop_length=64, batch_size=8)
+        samples = np.arange(64 * 60, dtype=np.float32)
+        chunks = np.split(samples, [64 * 50])
+        mock_librosa_stream.return_value = iter(chunks)
+
+        analyzer._reader_worker()
+
+        batches = []
+        while (item := analyzer._audio_queue.get_nowait()) is not None:
+            batches.append(item)
+        indices = np.concatenate([np.arange(i, i + len(f)) for i, f in batches])
+        frames = np.concatenate([f for _, f in batches])
+        expected_count = (len(samples) - 256) // 64 + 1
+        assert all(len(f) <= 8 for _, f in batches)
+        np.testing.assert_array_equal(indices, np.arange(expected_count))
+        for i in (0, 46, expected_count - 1):
+            np.testing.assert_array_equal(frames[i], samples[i * 64:i * 64 + 256])
+
+    def test_fftw_wisdom_round_trip(self, tmp_path: Path) -> None:
+        """Test that FFTW wisdom is saved and imported again, and ignored without pyFFTW."""
+        wisdom_path = tmp_path / "config" / "fftw.wisdom"
+        if spectrum_analyzer.pyfftw is None:
+            spectrum_analyzer.save_fftw_wisdom(wisdom_path)
+            spectrum_analyzer.load_fftw_wisdom(wisdom_path)
+            assert not wisdom_path.exists()
+            return
+
+        spectrum_analyzer.save_fftw_wisdom(wisdom_path)
+        saved = wisdom_path.read_bytes().split(b"\0")
+        assert len(saved) == 3
+
+        with patch.object(spectrum_analyzer.pyfftw, 'import_wisdom') as mock_import:
+            spectrum_analyzer.load_fftw_wisdom(wisdom_path)
+        mock_import.assert_called_once_with(tuple(saved))
@@ -0,0 +1,6 @@
+"""Shared pytest configuration for the SpectrumWeaver test suite."""
+
+import os
+
+# Render widgets without a display; set before anything imports Qt
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
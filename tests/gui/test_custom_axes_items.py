@@ -1,9 +1,12 @@
 """Tests for the custom axis items module."""
 
 import pyqtgraph as pg
+import pytest
 from pytestqt.qtbot import QtBot
 
-from src.gui.custom_axes_items import TimeAxisItem, FreqAxisItem
+from src.gui.custom_axes_items import TimeAxisItem, FreqAxisItem, _format_freq_ticks
+
+pytestmark = pytest.mark.gui
 
 
 class TestTimeAxisItem:
@@ -132,3 +135,14 @@ class TestFreqAxisItem:
 
         result = axis.tickStrings(test_values, scale=1, spacing=1)
         assert result == expected
+
+    def test_tick_strings_cached(self, qtbot: QtBot) -> None:
+        """Test that repeated tick values reuse the memoized labels."""
+        axis = FreqAxisItem(orientation='left')
+
+        first = axis.tickStrings([0, 5000, 10000], scale=1, spacing=5000)
+        hits = _format_freq_ticks.cache_info().hits
+        second = axis.tickStrings([0, 5000, 10000.0000001], scale=1, spacing=5000)
+
+        assert first == second == ["0 kHz", "5 kHz", "10 kHz"]
+        assert _format_freq_ticks.cache_info().hits == hits + 1
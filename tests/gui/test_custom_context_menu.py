@@ -1,41 +1,34 @@
 """Tests for the CustomContextMenu class."""
 
-import tempfile
-from collections.abc import Generator
-from pathlib import Path
 from unittest.mock import Mock, patch
 
 import numpy as np
 import pytest
-from PySide6.QtWidgets import QWidget
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QImage, qGray
+from PySide6.QtWidgets import QTableView, QWidget
 from pytestqt.qtbot import QtBot
 
-from src.gui.custom_context_menu import CustomContextMenu
+from src.gui.custom_context_menu import CustomContextMenu, DetailsModel
+
+pytestmark = pytest.mark.gui
 
 
 @pytest.fixture
-def parent(qtbot: QtBot) -> Generator[QWidget, None, None]:
+def parent(qtbot: QtBot) -> QWidget:
     """Fixture to create a QWidget parent instance."""
     widget = QWidget()
-    yield widget
-
-    # Cleanup
-    try:
-        widget.close()
-        widget.deleteLater()
-    except RuntimeError:
-        # The widget is already closed
-        pass
-
+    # pytest-qt closes and deletes the widget after the test
+    qtbot.addWidget(widget)
+    return widget
 
-@pytest.fixture
-def mock_audio_file() -> Generator[str, None, None]:
-    """Fixture to create a temporary audio file path."""
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-        yield tmp_file.name
 
-    # Cleanup
-    Path(tmp_file.name).unlink(missing_ok=True)
+@pytest.fixture(scope="session")
+def mock_audio_file(tmp_path_factory: pytest.TempPathFactory) -> str:
+    """Fixture to create an empty audio file path, shared by the whole session."""
+    path = tmp_path_factory.mktemp("audio") / "mock.wav"
+    path.touch()
+    return str(path)
 
 
 @pytest.fixture
@@ -78,7 +71,7 @@ def sample_metadata():
 @pytest.fixture
 def sample_spectrogram_data():
     """Fixture to provide sample spectrogram data."""
-    return np.random.uniform(-120, 0, (431, 1025))
+    return np.random.default_rng(0).integers(0, 256, (1025, 431), dtype=np.uint8)
 
 
 @pytest.fixture
@@ -145,32 +138,66 @@ class TestCustomContextMenu:
         mock_qmenu.assert_called_once_with(parent)
 
         # Verify actions were added
-        assert mock_menu_instance.addAction.call_count == 3  # export, details, settings
+        assert mock_menu_instance.addAction.call_count == 4  # export, grayscale export, details, settings
 
         # Verify exec was called
         mock_menu_instance.exec.assert_called_once()
 
+    @patch('src.gui.custom_context_menu.QImageWriter')
     @patch('src.gui.custom_context_menu.QFileDialog')
-    def test_export_spectrogram_png(self, mock_dialog, context_menu, mock_audio_file) -> None:
+    def test_export_spectrogram_png(self, mock_dialog, mock_writer, context_menu, mock_audio_file) -> None:
         """Test the PNG export functionality."""
         # Mock file dialog
         mock_dialog.getSaveFileName.return_value = ("test_export.png", "PNG Files (*.png)")
 
-        # Mock the image item and pixmap
-        mock_qimg = Mock()
-        mock_qimg_flipped = Mock()
-        mock_qimg.mirrored.return_value = mock_qimg_flipped
-        context_menu.image_item.getPixmap.return_value.toImage.return_value = mock_qimg
-
         # Call the method
         context_menu._export_spectrogram_png()
 
         # Verify file dialog was called
         mock_dialog.getSaveFileName.assert_called_once()
 
-        # Verify image processing
-        mock_qimg.mirrored.assert_called_once_with(False, True)
-        mock_qimg_flipped.save.assert_called_once_with("test_export.png")
+        # Verify the full-resolution image is written with fast compression
+        context_menu.image_item.getPixmap.assert_not_called()
+        mock_writer.assert_called_once_with("test_export.png", b"png")
+        mock_writer.return_value.setCompression.assert_called_once_with(20)
+        qimg = mock_writer.return_value.write.call_args.args[0]
+        assert qimg.format() == QImage.Format.Format_Indexed8
+        assert (qimg.width(), qimg.height()) == (431, 1025)
+
+    @patch('src.gui.custom_context_menu.QFileDialog')
+    def test_export_spectrogram_png_colors(self, mock_dialog, context_menu, tmp_path) -> None:
+        """Test the PNG export colors levels through the image item's lookup table."""
+        file_path = str(tmp_path / "color.png")
+        mock_dialog.getSaveFileName.return_value = (file_path, "PNG Files (*.png)")
+        data = np.zeros((3, 4), dtype=np.uint8)
+        data[-1, 0] = 255  # highest frequency bin, first frame
+        context_menu.spectrogram_data = data
+        ramp = np.arange(256, dtype=np.uint8)
+        context_menu.image_item.lut = np.stack([ramp, np.zeros_like(ramp), ramp[::-1]], axis=1)
+
+        context_menu._export_spectrogram_png()
+
+        qimg = QImage(file_path)
+        assert (qimg.width(), qimg.height()) == (4, 3)
+        assert qimg.pixelColor(0, 0).getRgb()[:3] == (255, 0, 0)
+        assert qimg.pixelColor(1, 0).getRgb()[:3] == (0, 0, 255)
+
+    @patch('src.gui.custom_context_menu.QFileDialog')
+    def test_export_spectrogram_grayscale_png(self, mock_dialog, context_menu, tmp_path) -> None:
+        """Test the grayscale PNG export writes the data with frequency bottom to top."""
+        file_path = str(tmp_path / "gray.png")
+        mock_dialog.getSaveFileName.return_value = (file_path, "PNG Files (*.png)")
+        data = np.zeros((3, 4), dtype=np.uint8)
+        data[-1, 0] = 255  # highest frequency bin, first frame
+        context_menu.spectrogram_data = data
+
+        context_menu._export_spectrogram_grayscale_png()
+
+        qimg = QImage(file_path)
+        assert qimg.format() == QImage.Format.Format_Grayscale8
+        assert (qimg.width(), qimg.height()) == (4, 3)
+        assert qGray(qimg.pixel(0, 0)) == 255
+        assert qGray(qimg.pixel(1, 0)) == 0
 
     def test_export_no_spectrogram_data(self, context_menu) -> None:
         """Test export when no spectrogram data is available."""
@@ -211,6 +238,23 @@ class TestCustomContextMenu:
         # Should return early
         mock_isfile.assert_called_once()
 
+    @patch('mutagen.File')
+    def test_show_details_parses_file_once(self, mock_mutagen, context_menu, parent, qtbot: QtBot) -> None:
+        """Test that the background details worker parses the audio file a single time."""
+        mock_mutagen.return_value.info = Mock(length=5.0, sample_rate=44100, bitrate=320000,
+                                              channels=2, codec=None, bits_per_sample=16)
+        mock_mutagen.return_value.tags = {'title': ['Test']}
+
+        context_menu._show_details_dialog()
+
+        # The table is added once the worker delivers the details
+        qtbot.waitUntil(lambda: len(parent.findChildren(QTableView)) == 1)
+        mock_mutagen.assert_called_once_with(context_menu.audio_path, easy=True)
+        model = parent.findChildren(QTableView)[0].model()
+        cells = {model.index(row, 0).data(): model.index(row, 1).data() for row in range(model.rowCount())}
+        assert cells["Sample rate"] == "44100 Hz"
+        assert cells["Title"] == "Test"
+
     def test_get_batch_size(self, context_menu) -> None:
         """Test getting the batch size setting."""
         # Default value
@@ -239,6 +283,15 @@ class TestCustomContextMenu:
         context_menu._colormap = 'plasma'
         assert context_menu._colormap == 'plasma'
 
+    def test_colormap_changed(self, context_menu, mock_image_item, mock_colorbar) -> None:
+        """Test that a colormap change is applied to the image and the colorbar."""
+        context_menu.on_colormap_changed('magma')
+
+        assert context_menu._colormap == 'magma'
+        mock_colorbar.setColorMap.assert_called_once()
+        assert mock_colorbar.setColorMap.call_args.args[0].name == 'magma'
+        mock_image_item.setColorMap.assert_called_once_with(mock_colorbar.setColorMap.call_args.args[0])
+
     def test_show_grid_property(self, context_menu) -> None:
         """Test the show grid property."""
         # Default value
@@ -247,3 +300,17 @@ class TestCustomContextMenu:
         # Change value
         context_menu._show_grid = False
         assert context_menu._show_grid is False
+
+
+class TestDetailsModel:
+    """Test cases for the DetailsModel class."""
+    def test_details_model_data(self) -> None:
+        """Test that the model exposes rows, columns and headers of the details."""
+        model = DetailsModel([("Format", "WAV"), ("Channels", 2)])
+
+        assert model.rowCount() == 2
+        assert model.columnCount() == 2
+        assert model.index(0, 1).data() == "WAV"
+        assert model.index(1, 1).data() == "2"
+        assert model.headerData(0, Qt.Orientation.Horizontal) == "Parameter"
+        assert model.headerData(1, Qt.Orientation.Vertical) is None
@@ -5,15 +5,16 @@ from collections.abc import Generator
 import pytest
 from PySide6.QtCore import QSize, Qt
 from PySide6.QtGui import QIcon, QPixmap
-from PySide6.QtWidgets import QLabel, QWidget
-from pytestqt.qtbot import QtBot
+from PySide6.QtWidgets import QApplication, QLabel, QWidget
 
 from src.gui.custom_title_bar import CustomTitleBar
 
+pytestmark = pytest.mark.gui
 
-@pytest.fixture
-def parent(qtbot: QtBot) -> Generator[QWidget, None, None]:  # noqa: ARG001
-    """Fixture to create a simple parent QWidget instance."""
+
+@pytest.fixture(scope="module")
+def parent(qapp: QApplication) -> Generator[QWidget, None, None]:  # noqa: ARG001
+    """Fixture to create a simple parent QWidget instance, shared by the module."""
     # Create a parent QWidget for the CustomTitleBar
     widget = QWidget()
     yield widget
@@ -28,11 +29,28 @@ def parent(qtbot: QtBot) -> Generator[QWidget, None, None]:  # noqa: ARG001
         # Exception can be ignored
         pass
 
-@pytest.fixture
-def title_bar(parent: QWidget) -> CustomTitleBar:
-    """Fixture to create a CustomTitleBar instance with a QWidget parent."""
+@pytest.fixture(scope="module")
+def shared_title_bar(parent: QWidget) -> CustomTitleBar:
+    """Fixture to create one CustomTitleBar instance with a QWidget parent."""
     return CustomTitleBar(parent)
 
+@pytest.fixture
+def title_bar(shared_title_bar: CustomTitleBar, parent: QWidget) -> Generator[CustomTitleBar, None, None]:
+    """Fixture to provide the shared CustomTitleBar, reset after each test."""
+    yield shared_title_bar
+
+    # Reset the state tests change instead of rebuilding the widgets
+    parent.setWindowTitle("")
+    parent.setWindowIcon(QIcon())
+    shared_title_bar._icon_pix_cache.clear()
+
+@pytest.fixture(scope="module")
+def red_icon(qapp: QApplication) -> QIcon:  # noqa: ARG001
+    """Fixture to create a red 20x20 icon once for the module."""
+    pixmap = QPixmap(20, 20)
+    pixmap.fill(Qt.GlobalColor.red)
+    return QIcon(pixmap)
+
 def test_custom_title_bar_init(title_bar: CustomTitleBar, parent: QWidget) -> None:
     """Test the initialization of the CustomTitleBar."""
     assert title_bar is not None
@@ -72,15 +90,10 @@ def test_set_title(title_bar: CustomTitleBar, parent: QWidget) -> None:
     parent.setWindowTitle(test_title)
     assert title_bar.titleLabel.text() == test_title
 
-def test_set_icon(title_bar: CustomTitleBar, parent: QWidget) -> None:
+def test_set_icon(title_bar: CustomTitleBar, parent: QWidget, red_icon: QIcon) -> None:
     """Test the _set_icon method."""
-    # Create a dummy icon
-    pixmap = QPixmap(20, 20)
-    pixmap.fill(Qt.GlobalColor.red)
-    test_icon = QIcon(pixmap)
-
     # Simulate the parent widget icon changing
-    parent.setWindowIcon(test_icon)
+    parent.setWindowIcon(red_icon)
 
     # Check if the iconLabel has a pixmap set
     assert title_bar.iconLabel.pixmap() is not None
@@ -174,3 +187,12 @@ def test_empty_icon_handling(title_bar: CustomTitleBar, parent: QWidget) -> None
     # Should handle empty icon gracefully
     pixmap = title_bar.iconLabel.pixmap()
     assert pixmap is not None
+
+def test_set_icon_reuses_scaled_pixmap(title_bar: CustomTitleBar, red_icon: QIcon) -> None:
+    """Test that setting the same icon again reuses the cached scaled pixmap."""
+    title_bar._set_icon(red_icon)
+    cached = title_bar._icon_pix_cache[red_icon.cacheKey()]
+    title_bar._set_icon(red_icon)
+
+    assert len(title_bar._icon_pix_cache) == 1
+    assert title_bar._icon_pix_cache[red_icon.cacheKey()] is cached
@@ -1,87 +1,125 @@
 """Tests for the SpectrumViewer class."""
 
-import tempfile
 from collections.abc import Generator
-from pathlib import Path
 from unittest.mock import Mock, patch
 import numpy as np
 
 import pytest
-from PySide6.QtWidgets import QStackedWidget, QVBoxLayout
-from pytestqt.qtbot import QtBot
-import pyqtgraph as pg
 
-from src.gui.spectrum_viewer import SpectrumViewer
+# Skip the module instead of failing collection where the GUI stack is missing
+QtCore = pytest.importorskip("PySide6.QtCore")
+QtGui = pytest.importorskip("PySide6.QtGui")
+QtWidgets = pytest.importorskip("PySide6.QtWidgets")
+pg = pytest.importorskip("pyqtgraph")
+
+from pytestqt.qtbot import QtBot  # noqa: E402
+
+from src.gui.spectrum_viewer import SpectrumViewer  # noqa: E402
+
+QThreadPool = QtCore.QThreadPool
+QStackedWidget = QtWidgets.QStackedWidget
+QVBoxLayout = QtWidgets.QVBoxLayout
+
+pytestmark = pytest.mark.gui
 
 
 @pytest.fixture
-def parent(qtbot: QtBot) -> Generator[QStackedWidget, None, None]:
+def parent(qtbot: QtBot) -> QStackedWidget:
     """Fixture to create a QStackedWidget parent instance."""
     widget = QStackedWidget()
-    yield widget
+    # pytest-qt closes and deletes the widget after the test
+    qtbot.addWidget(widget)
+    return widget
 
-    # Cleanup
-    try:
-        widget.close()
-        widget.deleteLater()
-    except RuntimeError:
-        # The widget is already closed
-        pass
+
+@pytest.fixture(scope="session")
+def mock_audio_file(tmp_path_factory: pytest.TempPathFactory) -> str:
+    """Fixture to create an empty audio file path, shared by the whole session."""
+    path = tmp_path_factory.mktemp("audio") / "mock.wav"
+    path.touch()
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def analyzer_patch():
+    """Fixture to patch SpectrumAnalyzer once for the whole module."""
+    with patch('src.gui.spectrum_viewer.SpectrumAnalyzer') as mock:
+        yield mock
+
+
+def make_mock_analyzer() -> Mock:
+    """Create a mock SpectrumAnalyzer instance for a 5 second file."""
+    mock_instance = Mock()
+    mock_instance.load_metadata.return_value = mock_instance.start.return_value = {
+        'sample_rate': 44100,
+        'duration': 5.0,
+        'total_samples': 220500,
+        'fft_size': 2048,
+        'hop_length': 512,
+        'frequencies': np.linspace(0, 22050, 1025),
+        'num_time_frames': 431
+    }
+    mock_instance.is_running = False
+    return mock_instance
 
 
 @pytest.fixture
-def mock_audio_file() -> Generator[str, None, None]:
-    """Fixture to create a temporary audio file path."""
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-        yield tmp_file.name
+def mock_spectrum_analyzer(analyzer_patch):
+    """Fixture to create a mock SpectrumAnalyzer, fresh for each test."""
+    analyzer_patch.reset_mock()
+    analyzer_patch.return_value = make_mock_analyzer()
+    return analyzer_patch
+
+
+@pytest.fixture(scope="class")
+def viewer(qapp, mock_audio_file: str, analyzer_patch) -> Generator[SpectrumViewer, None, None]:  # noqa: ARG001
+    """Fixture to build one SpectrumViewer shared by the read-only checks of a class."""
+    parent = QStackedWidget()
+    analyzer_patch.return_value = make_mock_analyzer()
+    with patch('src.gui.spectrum_viewer.QThreadPool') as pool:
+        pool.globalInstance.return_value.start.side_effect = lambda runnable: runnable.run()
+        viewer = SpectrumViewer(parent, mock_audio_file)
+    yield viewer
 
     # Cleanup
-    Path(tmp_file.name).unlink(missing_ok=True)
+    viewer.close()
+    parent.close()
+    parent.deleteLater()
 
 
-@pytest.fixture
-def mock_spectrum_analyzer():
-    """Fixture to create a mock SpectrumAnalyzer."""
-    with patch('src.gui.spectrum_viewer.SpectrumAnalyzer') as mock:
-        mock_instance = Mock()
-        mock_instance.start.return_value = {
-            'sample_rate': 44100,
-            'duration': 5.0,
-            'total_samples': 220500,
-            'fft_size': 2048,
-            'hop_length': 512,
-            'frequencies': np.linspace(0, 22050, 1025),
-            'num_time_frames': 431
-        }
-        mock_instance.is_running = False
-        mock.return_value = mock_instance
+@pytest.fixture(autouse=True)
+def inline_thread_pool():
+    """Fixture to load analyzer metadata synchronously instead of on a pool thread."""
+    with patch('src.gui.spectrum_viewer.QThreadPool') as mock:
+        mock.globalInstance.return_value.start.side_effect = lambda runnable: runnable.run()
         yield mock
 
 
 class TestSpectrumViewer:
     """Test cases for the SpectrumViewer class."""
 
-    def test_spectrum_viewer_init(self, parent: QStackedWidget, mock_audio_file: str, mock_spectrum_analyzer) -> None:
-        """Test the initialization of the SpectrumViewer."""
-        viewer = SpectrumViewer(parent, mock_audio_file)
-
-        assert viewer is not None
-        assert viewer.parent() is parent
-        assert viewer.audio_path == mock_audio_file
-        assert isinstance(viewer.plot_widget, pg.PlotWidget)
-        assert isinstance(viewer.image_item, pg.ImageItem)
-        assert viewer.analyzer is not None
-
-    def test_spectrum_viewer_layout(self, parent: QStackedWidget, mock_audio_file: str, mock_spectrum_analyzer) -> None:
-        """Test the layout setup of the SpectrumViewer."""
-        viewer = SpectrumViewer(parent, mock_audio_file)
-
-        # Check layout is set
-        assert isinstance(viewer.layout(), QVBoxLayout)
-
-        # Check plot widget is in layout
-        layout = viewer.layout()
-        assert layout.indexOf(viewer.plot_widget) != -1
+    @pytest.mark.parametrize("check", [
+        lambda viewer, path: isinstance(viewer.parent(), QStackedWidget),
+        lambda viewer, path: viewer.audio_path == path,
+        lambda viewer, path: isinstance(viewer.plot_widget, pg.PlotWidget),
+        lambda viewer, path: isinstance(viewer.image_item, pg.ImageItem),
+        lambda viewer, path: viewer.analyzer is not None,
+        lambda viewer, path: isinstance(viewer.layout(), QVBoxLayout),
+        lambda viewer, path: viewer.layout().indexOf(viewer.plot_widget) != -1,
+        lambda viewer, path: {'sample_rate', 'duration', 'frequencies'} <= viewer.metadata.keys(),
+        lambda viewer, path: viewer.acceptDrops(),
+        lambda viewer, path: viewer.context_menu.audio_path == path,
+        lambda viewer, path: hasattr(viewer, 'analysis_complete'),
+        lambda viewer, path: isinstance(viewer.spectrogram_data, np.ndarray),
+        lambda viewer, path: viewer.spectrogram_data.shape == (1025, 431),  # Based on mock metadata
+    ], ids=[
+        "parent", "audio_path", "plot_widget", "image_item", "analyzer", "layout", "plot_in_layout",
+        "metadata", "accepts_drops", "context_menu", "analysis_complete_signal", "spectrogram_array",
+        "spectrogram_shape",
+    ])
+    def test_viewer_setup(self, viewer: SpectrumViewer, mock_audio_file: str, check) -> None:
+        """Test the state of a SpectrumViewer created with an audio path."""
+        assert check(viewer, mock_audio_file)
 
     def test_spectrum_analyzer_creation(self, parent: QStackedWidget, mock_audio_file: str, mock_spectrum_analyzer) -> None:
         """Test that SpectrumAnalyzer is created with correct parameters."""
@@ -96,31 +134,6 @@ class TestSpectrumViewer:
         assert call_args[1]['hop_length'] == 512
         assert call_args[1]['batch_size'] == 16
 
-    def test_metadata_handling(self, parent: QStackedWidget, mock_audio_file: str, mock_spectrum_analyzer) -> None:
-        """Test that metadata is properly handled."""
-        viewer = SpectrumViewer(parent, mock_audio_file)
-
-        # Check metadata was set
-        assert viewer.metadata is not None
-        assert 'sample_rate' in viewer.metadata
-        assert 'duration' in viewer.metadata
-        assert 'frequencies' in viewer.metadata
-
-    def test_drag_and_drop_setup(self, parent: QStackedWidget, mock_audio_file: str, mock_spectrum_analyzer) -> None:
-        """Test that drag and drop is properly set up."""
-        viewer = SpectrumViewer(parent, mock_audio_file)
-
-        # Check accepts drops
-        assert viewer.acceptDrops()
-
-    def test_context_menu_setup(self, parent: QStackedWidget, mock_audio_file: str, mock_spectrum_analyzer) -> None:
-        """Test that context menu is properly set up."""
-        viewer = SpectrumViewer(parent, mock_audio_file)
-
-        # Check context menu is created
-        assert viewer.context_menu is not None
-        assert viewer.context_menu.audio_path == mock_audio_file
-
     def test_load_audio_method(self, parent: QStackedWidget, mock_spectrum_analyzer) -> None:
         """Test the load_audio method."""
         viewer = SpectrumViewer(parent)
@@ -143,23 +156,6 @@ class TestSpectrumViewer:
         assert viewer.audio_path is None
         assert viewer.analyzer is None
 
-    def test_signals_connection(self, parent: QStackedWidget, mock_audio_file: str, mock_spectrum_analyzer) -> None:
-        """Test that signals are properly connected."""
-        viewer = SpectrumViewer(parent, mock_audio_file)
-
-        # Check signals exist
-        assert hasattr(viewer, 'frame_received')
-        assert hasattr(viewer, 'analysis_complete')
-
-    def test_spectrogram_data_initialization(self, parent: QStackedWidget, mock_audio_file: str, mock_spectrum_analyzer) -> None:
-        """Test that spectrogram data is properly initialized."""
-        viewer = SpectrumViewer(parent, mock_audio_file)
-
-        # Check spectrogram data array is created
-        assert viewer.spectrogram_data is not None
-        assert isinstance(viewer.spectrogram_data, np.ndarray)
-        assert viewer.spectrogram_data.shape == (431, 1025)  # Based on mock metadata
-
     def test_analysis_start_called(self, parent: QStackedWidget, mock_audio_file: str, mock_spectrum_analyzer) -> None:
         """Test that analysis is started when viewer is created with audio path."""
         SpectrumViewer(parent, mock_audio_file)
@@ -173,3 +169,132 @@ class TestSpectrumViewer:
 
         # Check title is set
         assert viewer.plot_widget.plotItem.titleLabel.text == mock_audio_file
+
+    def test_frame_batch_written_to_spectrogram(self, parent: QStackedWidget, mock_audio_file: str, mock_spectrum_analyzer) -> None:
+        """Test that a batch of FFT rows lands in consecutive spectrogram frames."""
+        viewer = SpectrumViewer(parent, mock_audio_file)
+        batch = np.full((4, 1025), -60.0, dtype=np.float32)
+        batch[:, 0] = [-200.0, -120.0, 0.0, 10.0]
+
+        viewer.analyzer.callback(10, batch)
+
+        assert viewer.spectrogram_data.dtype == np.uint8
+        assert np.all(viewer.spectrogram_data[1:, 10:14] == 127)  # -60 dB, half way
+        np.testing.assert_array_equal(viewer.spectrogram_data[0, 10:14], [0, 0, 255, 255])
+        assert viewer.spectrogram_data[0, 14] == 0
+        assert viewer._dirty_end == 14
+
+        # The analyzer's quantization scratch buffer is reused by later batches
+        scratch = viewer.analyzer.callback.args[1]._buf
+        viewer.analyzer.callback(20, batch[:2])
+        assert viewer.analyzer.callback.args[1]._buf is scratch
+        np.testing.assert_array_equal(viewer.spectrogram_data[0, 20:22], [0, 0])
+
+    def test_stale_analyzer_frames_dropped(self, parent: QStackedWidget, mock_audio_file: str,
+                                           mock_spectrum_analyzer) -> None:
+        """Test that a worker outliving stop() cannot write into the next file's spectrogram."""
+        viewer = SpectrumViewer(parent, mock_audio_file)
+        old_callback = viewer.analyzer.callback
+        mock_spectrum_analyzer.return_value = make_mock_analyzer()
+
+        viewer.load_audio("next.wav")
+        assert viewer.analyzer is mock_spectrum_analyzer.return_value
+        assert viewer.analyzer.callback.args[1] is not old_callback.args[1]
+
+        old_callback(0, np.zeros((16, 1025), dtype=np.float32))
+        old_callback(-1, np.array([]))
+
+        assert not viewer.spectrogram_data.any()
+        assert viewer._dirty_end == 0
+
+    def test_display_redrawn_only_when_dirty(self, parent: QStackedWidget, mock_audio_file: str, mock_spectrum_analyzer) -> None:
+        """Test that the refresh timer redraws once per batch of new frames."""
+        viewer = SpectrumViewer(parent, mock_audio_file)
+        assert viewer._refresh_timer.isActive()
+        viewer.analyzer.callback(0, np.full((4, 1025), -60.0, dtype=np.float32))
+
+        with patch.object(viewer.image_item, 'setImage') as mock_set_image, \
+                patch.object(viewer.image_item, 'updateFrames') as mock_update_frames:
+            viewer._update_display()
+            viewer._update_display()
+
+        mock_set_image.assert_not_called()
+        mock_update_frames.assert_called_once_with(0, 4)
+        assert viewer._last_displayed_frame == 4
+        assert viewer.image_item.image.base is viewer.spectrogram_data
+
+    def test_display_bins_max_held(self, parent: QStackedWidget, mock_audio_file: str, mock_spectrum_analyzer) -> None:
+        """Test that the display keeps the loudest bin of each group when the plot is short."""
+        viewer = SpectrumViewer(parent, mock_audio_file)
+        batch = np.full((2, 1025), -120.0, dtype=np.float32)
+        batch[0, 5] = 0.0
+        viewer.analyzer.callback(0, batch)
+        viewer._update_display()
+
+        with patch.object(viewer, '_display_bin_count', return_value=100):
+            viewer._rebuild_display()
+
+        assert viewer.display_data.shape == (100, 431)
+        assert viewer.display_data[0, 0] == 255
+        assert viewer.display_data[:, 1].max() == 0
+        assert viewer.image_item.image.shape == (100, 431)
+
+        # New frames are reduced into the display bins on the next tick
+        viewer.analyzer.callback(2, np.zeros((1, 1025), dtype=np.float32))
+        viewer._update_display()
+        assert np.all(viewer.display_data[:, 2] == 255)
+
+    def test_color_export_keeps_full_resolution(self, parent: QStackedWidget, mock_audio_file: str,
+                                                mock_spectrum_analyzer, tmp_path) -> None:
+        """Test that the color PNG export is not limited to the reduced display bins."""
+        viewer = SpectrumViewer(parent, mock_audio_file)
+        with patch.object(viewer, '_display_bin_count', return_value=100):
+            viewer._rebuild_display()
+        assert viewer.image_item.image.shape == (100, 431)
+
+        file_path = tmp_path / "export.png"
+        viewer.context_menu.spectrogram_data = viewer.spectrogram_data
+        with patch('src.gui.custom_context_menu.QFileDialog.getSaveFileName',
+                   return_value=(str(file_path), "PNG Files (*.png)")):
+            viewer.context_menu._export_spectrogram_png()
+
+        exported = QtGui.QImage(str(file_path))
+        assert (exported.height(), exported.width()) == viewer.spectrogram_data.shape
+
+    @pytest.mark.parametrize("refresh_rate, interval", [(144.0, 6), (60.0, 16), (0.0, 16), (24.0, 33)])
+    def test_refresh_interval_follows_screen(self, parent: QStackedWidget, mock_spectrum_analyzer,
+                                             refresh_rate: float, interval: int) -> None:
+        """Test that the redraw interval matches the screen refresh rate."""
+        viewer = SpectrumViewer(parent)
+
+        with patch.object(viewer, 'screen', return_value=Mock(refreshRate=Mock(return_value=refresh_rate))):
+            assert viewer._refresh_interval_ms() == interval
+
+    def test_lookup_table_shared(self, parent: QStackedWidget, mock_spectrum_analyzer) -> None:
+        """Test that viewers reuse the precomputed viridis lookup table."""
+        first = SpectrumViewer(parent)
+        second = SpectrumViewer(parent)
+
+        assert first.image_item.lut is second.image_item.lut
+        assert first.image_item.lut.shape == (256, 3)
+
+    def test_metadata_loaded_off_gui_thread(self, parent: QStackedWidget, mock_audio_file: str,
+                                            mock_spectrum_analyzer, inline_thread_pool, qtbot: QtBot) -> None:
+        """Test that the analysis only starts once the pool thread has delivered the metadata."""
+        inline_thread_pool.globalInstance.return_value = QThreadPool()
+        viewer = SpectrumViewer(parent, mock_audio_file)
+        analyzer = mock_spectrum_analyzer.return_value
+
+        qtbot.waitUntil(lambda: viewer.spectrogram_data is not None)
+
+        analyzer.load_metadata.assert_called_once_with()
+        analyzer.start.assert_called_once_with()
+        assert viewer.spectrogram_data.shape == (1025, 431)
+
+    def test_supported_audio_file_check(self) -> None:
+        """Test the audio extension check used by drag and drop."""
+        assert SpectrumViewer._is_supported_audio_file("/music/Track.FLAC")
+        assert SpectrumViewer._is_supported_audio_file("C:\\audio\\song.mp3")
+        assert not SpectrumViewer._is_supported_audio_file("/music/notes.txt")
+        assert not SpectrumViewer._is_supported_audio_file("/music.wav/readme")
+        assert not SpectrumViewer._is_supported_audio_file("no_extension")
@@ -1,8 +1,5 @@
 """Tests for the SpectrumViewer class."""
 
-import tempfile
-from collections.abc import Generator
-from pathlib import Path
 from unittest.mock import Mock, patch
 import numpy as np
 
@@ -13,48 +10,57 @@ import pyqtgraph as pg
 
 from src.gui.spectrum_viewer import SpectrumViewer
 
+pytestmark = pytest.mark.gui
+
 
 @pytest.fixture
-def parent(qtbot: QtBot) -> Generator[QStackedWidget, None, None]:
+def parent(qtbot: QtBot) -> QStackedWidget:
     """Fixture to create a QStackedWidget parent instance."""
     widget = QStackedWidget()
-    yield widget
+    # pytest-qt closes and deletes the widget after the test
+    qtbot.addWidget(widget)
+    return widget
 
-    # Cleanup
-    try:
-        widget.close()
-        widget.deleteLater()
-    except RuntimeError:
-        # The widget is already closed
-        pass
 
+@pytest.fixture(scope="session")
+def mock_audio_file(tmp_path_factory: pytest.TempPathFactory) -> str:
+    """Fixture to create an empty audio file path, shared by the whole session."""
+    path = tmp_path_factory.mktemp("audio") / "mock.wav"
+    path.touch()
+    return str(path)
 
-@pytest.fixture
-def mock_audio_file() -> Generator[str, None, None]:
-    """Fixture to create a temporary audio file path."""
-    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-        yield tmp_file.name
 
-    # Cleanup
-    Path(tmp_file.name).unlink(missing_ok=True)
+@pytest.fixture(scope="module")
+def analyzer_patch():
+    """Fixture to patch SpectrumAnalyzer once for the whole module."""
+    with patch('src.gui.spectrum_viewer.SpectrumAnalyzer') as mock:
+        yield mock
 
 
 @pytest.fixture
-def mock_spectrum_analyzer():
-    """Fixture to create a mock SpectrumAnalyzer."""
-    with patch('src.gui.spectrum_viewer.SpectrumAnalyzer') as mock:
-        mock_instance = Mock()
-        mock_instance.start.return_value = {
-            'sample_rate': 44100,
-            'duration': 5.0,
-            'total_samples': 220500,
-            'fft_size': 2048,
-            'hop_length': 512,
-            'frequencies': np.linspace(0, 22050, 1025),
-            'num_time_frames': 431
-        }
-        mock_instance.is_running = False
-        mock.return_value = mock_instance
+def mock_spectrum_analyzer(analyzer_patch):
+    """Fixture to create a mock SpectrumAnalyzer, fresh for each test."""
+    analyzer_patch.reset_mock()
+    mock_instance = Mock()
+    mock_instance.load_metadata.return_value = mock_instance.start.return_value = {
+        'sample_rate': 44100,
+        'duration': 5.0,
+        'total_samples': 220500,
+        'fft_size': 2048,
+        'hop_length': 512,
+        'frequencies': np.linspace(0, 22050, 1025),
+        'num_time_frames': 431
+    }
+    mock_instance.is_running = False
+    analyzer_patch.return_value = mock_instance
+    return analyzer_patch
+
+
+@pytest.fixture(autouse=True)
+def inline_thread_pool():
+    """Fixture to load analyzer metadata synchronously instead of on a pool thread."""
+    with patch('src.gui.spectrum_viewer.QThreadPool') as mock:
+        mock.globalInstance.return_value.start.side_effect = lambda runnable: runnable.run()
         yield mock
 
 
@@ -148,7 +154,6 @@ class TestSpectrumViewer:
         viewer = SpectrumViewer(parent, mock_audio_file)
 
         # Check signals exist
-        assert hasattr(viewer, 'frame_received')
         assert hasattr(viewer, 'analysis_complete')
 
     def test_spectrogram_data_initialization(self, parent: QStackedWidget, mock_audio_file: str, mock_spectrum_analyzer) -> None:
@@ -158,7 +163,7 @@ class TestSpectrumViewer:
         # Check spectrogram data array is created
         assert viewer.spectrogram_data is not None
         assert isinstance(viewer.spectrogram_data, np.ndarray)
-        assert viewer.spectrogram_data.shape == (431, 1025)  # Based on mock metadata
+        assert viewer.spectrogram_data.shape == (1025, 431)  # Based on mock metadata
 
     def test_analysis_start_called(self, parent: QStackedWidget, mock_audio_file: str, mock_spectrum_analyzer) -> None:
         """Test that analysis is started when viewer is created with audio path."""
@@ -0,0 +1,71 @@
+"""Tests for the StreamingImageItem class."""
+
+from unittest.mock import patch
+
+import numpy as np
+import pyqtgraph as pg
+import pytest
+from pytestqt.qtbot import QtBot
+
+from src.gui.streaming_image_item import StreamingImageItem
+
+pytestmark = pytest.mark.gui
+
+
+def make_item(data: np.ndarray, **kwargs) -> StreamingImageItem:
+    """Create an item bound to data and rendered once."""
+    item = StreamingImageItem()
+    item.setLookupTable(pg.colormap.get('viridis').getLookupTable(0.0, 1.0, 256))
+    item.setImage(data, levels=(0, 255), **kwargs)
+    item.render()
+    return item
+
+
+class TestStreamingImageItem:
+    """Test cases for the StreamingImageItem class."""
+
+    def test_update_frames_patches_rendered_image(self, qtbot: QtBot) -> None:
+        """Test that new frames are copied into the rendered image without a full render."""
+        data = np.zeros((6, 4), dtype=np.uint8)
+        item = make_item(data)
+        qimage = item.qimage
+
+        data[2:4] = 200
+        item.updateFrames(2, 4)
+
+        assert item.qimage is qimage
+        assert not item._renderRequired
+        assert [qimage.pixelIndex(x, 0) for x in range(6)] == [0, 0, 200, 200, 0, 0]
+
+    def test_update_frames_renders_row_major_image_in_place(self, qtbot: QtBot) -> None:
+        """Test that a contiguous row-major image backs the QImage directly."""
+        data = np.zeros((4, 6), dtype=np.uint8)
+        item = make_item(data, axisOrder='row-major')
+
+        data[:, 2:4] = 200
+        item.updateFrames(2, 4)
+
+        assert np.shares_memory(item.qimage.data, data)
+        assert not item._renderRequired
+        assert [item.qimage.pixelIndex(x, 0) for x in range(6)] == [0, 0, 200, 200, 0, 0]
+
+    def test_update_frames_falls_back_to_full_render(self, qtbot: QtBot) -> None:
+        """Test that a pending full render is not bypassed."""
+        data = np.zeros((6, 4), dtype=np.uint8)
+        item = make_item(data)
+        item.setLevels((0, 128))
+
+        item.updateFrames(0, 1)
+
+        assert item._renderRequired
+
+    def test_update_frames_without_render_flag(self, qtbot: QtBot) -> None:
+        """Test that a missing private render flag degrades to a full render."""
+        data = np.zeros((6, 4), dtype=np.uint8)
+        item = make_item(data)
+        del item._renderRequired
+
+        with patch.object(item, 'updateImage') as mock_update_image:
+            item.updateFrames(0, 1)
+
+        mock_update_image.assert_called_once_with()
@@ -1,8 +1,16 @@
 """Tests for the assets resources module."""
 
+import pytest
+
 from src.assets import resources
 
 
+@pytest.fixture(scope="session")
+def resource_data() -> memoryview:
+    """Fixture to expose the compiled resource data without copying it."""
+    return memoryview(resources.qt_resource_data)
+
+
 class TestResources:
     """Test cases for the resources module."""
 
@@ -15,9 +23,9 @@ class TestResources:
         assert hasattr(resources, 'qt_resource_data')
         assert isinstance(resources.qt_resource_data, bytes)
 
-    def test_qt_resource_data_not_empty(self) -> None:
+    def test_qt_resource_data_not_empty(self, resource_data: memoryview) -> None:
         """Test that qt_resource_data contains data."""
-        assert len(resources.qt_resource_data) > 0
+        assert len(resource_data) > 0
 
     def test_qt_resource_name_exists(self) -> None:
         """Test that qt_resource_name is defined."""
@@ -29,11 +37,12 @@ class TestResources:
         assert hasattr(resources, 'qt_resource_struct')
         assert isinstance(resources.qt_resource_struct, bytes)
 
-    def test_resource_data_contains_png_signature(self) -> None:
-        """Test that resource data contains PNG file signature."""
-        # PNG files start with specific signature bytes
+    def test_resource_data_contains_png_signature(self, resource_data: memoryview) -> None:
+        """Test that resource data starts with the PNG icon."""
+        # PNG files start with specific signature bytes; the icon is the first
+        # resource, stored right after its 4-byte big-endian length
         png_signature = b'\x89PNG\r\n\x1a\n'
-        assert png_signature in resources.qt_resource_data
+        assert resource_data[4:12] == png_signature
 
     def test_resource_name_structure(self) -> None:
         """Test that resource name structure is not empty."""